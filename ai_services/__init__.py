@@ -4,7 +4,9 @@ AI Services Package.
 Provides AI integration for the Voice Chat application.
 """
 
-from .config import ai_config, GeminiConfig, WhisperConfig, AIServiceConfig
+import importlib
+
+from .config import reload_config, GeminiConfig, WhisperConfig, AIServiceConfig
 from .exceptions import (
     AIServiceError,
     AIServiceConfigError,
@@ -14,7 +16,6 @@ from .exceptions import (
     QuotaExceededError,
     ModelError,
     ContentFilterError,
-    TimeoutError,
     AIServiceTimeoutError,
     NetworkError,
     InvalidRequestError,
@@ -31,25 +32,52 @@ from .models import (
     GenerationResponse,
     StreamChunk,
 )
-from .gemini_service import (
-    GeminiService,
-    gemini_service,
-    generate_reply,
-    generate_reply_stream,
-)
-from .whisper_service import (
-    WhisperService,
-    TranscriptionResult,
-    TranscriptionMetrics,
-    AudioMetadata,
-    get_whisper_service,
-    transcribe_audio,
-)
+
+# Service modules pull in the Google/HTTP SDKs, so they are imported
+# lazily on first attribute access (PEP 562).
+_LAZY_IMPORTS = {
+    # Gemini Service
+    "GeminiService": ".gemini_service",
+    "gemini_service": ".gemini_service",
+    "generate_reply": ".gemini_service",
+    "generate_reply_stream": ".gemini_service",
+    
+    # Whisper Service
+    "WhisperService": ".whisper_service",
+    "TranscriptionResult": ".whisper_service",
+    "TranscriptionMetrics": ".whisper_service",
+    "AudioMetadata": ".whisper_service",
+    "get_whisper_service": ".whisper_service",
+    "transcribe_audio": ".whisper_service",
+    
+    # Transcript Cache
+    "CachedTranscriber": ".transcript_cache",
+    "get_cached_transcriber": ".transcript_cache",
+}
+
+
+def __getattr__(name):
+    if name == "ai_config":
+        # Resolved on every access so reload_config() is visible here
+        return importlib.import_module(".config", __name__).ai_config
+    
+    if name == "TimeoutError":
+        # Deprecated alias, resolved (with a warning) by the exceptions module
+        return getattr(importlib.import_module(".exceptions", __name__), name)
+    
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 
 __all__ = [
     # Config
     "ai_config",
+    "reload_config",
     "GeminiConfig",
     "WhisperConfig",
     "AIServiceConfig",
@@ -63,7 +91,6 @@ __all__ = [
     "QuotaExceededError",
     "ModelError",
     "ContentFilterError",
-    "TimeoutError",
     "AIServiceTimeoutError",
     "NetworkError",
     "InvalidRequestError",
@@ -93,5 +120,9 @@ __all__ = [
     "AudioMetadata",
     "get_whisper_service",
     "transcribe_audio",
+    
+    # Transcript Cache
+    "CachedTranscriber",
+    "get_cached_transcriber",
 ]
 
@@ -6,15 +6,28 @@ Environment variables for AI providers.
 
 import os
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Callable, List, Optional
 
 
-@dataclass
+# Environment is resolved once at import; use reload_config() to re-read it
+_GEMINI_API_KEY = os.getenv("GEMINI_API_KEY", "")
+_GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+_GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT") or None
+_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
+_WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-1")
+_WHISPER_NORMALIZE_AUDIO = os.getenv("WHISPER_NORMALIZE_AUDIO", "false").lower() == "true"
+
+
+@dataclass(frozen=True, slots=True)
 class GeminiConfig:
     """Configuration for Google Gemini API."""
     
-    api_key: str = field(default_factory=lambda: os.getenv("GEMINI_API_KEY", ""))
-    model: str = field(default_factory=lambda: os.getenv("GEMINI_MODEL", "gemini-2.0-flash"))
+    api_key: str = _GEMINI_API_KEY
+    model: str = _GEMINI_MODEL
+    
+    # SDK transport: None lets the SDK pick gRPC (sync) / gRPC asyncio (async),
+    # both of which keep one long-lived channel per process
+    transport: Optional[str] = _GEMINI_TRANSPORT
     
     # Generation parameters
     max_output_tokens: int = 2048
@@ -28,6 +41,10 @@ class GeminiConfig:
     retry_min_wait: float = 1.0  # seconds
     retry_max_wait: float = 10.0  # seconds
     
+    # Response cache (only used for deterministic, temperature == 0 requests)
+    response_cache_size: int = 256
+    response_cache_ttl: int = 300  # seconds
+    
     # Safety settings
     block_dangerous_content: bool = True
     
@@ -36,15 +53,15 @@ class GeminiConfig:
         return bool(self.api_key)
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class WhisperConfig:
     """Configuration for OpenAI Whisper STT API."""
     
-    api_key: str = field(default_factory=lambda: os.getenv("OPENAI_API_KEY", ""))
-    model: str = field(default_factory=lambda: os.getenv("WHISPER_MODEL", "whisper-1"))
+    api_key: str = _OPENAI_API_KEY
+    model: str = _WHISPER_MODEL
     
     # Audio settings
-    supported_formats: tuple = ("mp3", "mp4", "mpeg", "mpga", "m4a", "wav", "webm", "ogg", "flac")
+    supported_formats: frozenset = frozenset({"mp3", "mp4", "mpeg", "mpga", "m4a", "wav", "webm", "ogg", "flac"})
     max_file_size_mb: int = 25  # OpenAI limit
     default_language: str = "vi"  # Vietnamese
     
@@ -57,20 +74,30 @@ class WhisperConfig:
     retry_min_wait: float = 2.0  # seconds
     retry_max_wait: float = 30.0  # seconds
     
-    # Sample rate for audio normalization
+    # Audio normalization (16 kHz mono Opus via ffmpeg before upload)
+    normalize_audio: bool = _WHISPER_NORMALIZE_AUDIO
     target_sample_rate: int = 16000  # Whisper optimal sample rate
     
+    def __post_init__(self):
+        # Accept any iterable of formats ("wav", ".WAV", ...) and store a
+        # normalized frozenset so membership checks are O(1)
+        object.__setattr__(
+            self,
+            "supported_formats",
+            frozenset(fmt.lower().lstrip(".") for fmt in self.supported_formats),
+        )
+    
     def validate(self) -> bool:
         """Check if configuration is valid."""
         return bool(self.api_key)
     
     def is_supported_format(self, filename: str) -> bool:
         """Check if audio format is supported."""
-        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        ext = os.path.splitext(filename)[1][1:].lower()
         return ext in self.supported_formats
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class AIServiceConfig:
     """Main AI service configuration."""
     
@@ -86,10 +113,18 @@ class AIServiceConfig:
     
     @classmethod
     def from_env(cls) -> "AIServiceConfig":
-        """Create config from environment variables."""
+        """Create config from the current environment variables."""
         return cls(
-            gemini=GeminiConfig(),
-            whisper=WhisperConfig(),
+            gemini=GeminiConfig(
+                api_key=os.getenv("GEMINI_API_KEY", ""),
+                model=os.getenv("GEMINI_MODEL", "gemini-2.0-flash"),
+                transport=os.getenv("GEMINI_TRANSPORT") or None,
+            ),
+            whisper=WhisperConfig(
+                api_key=os.getenv("OPENAI_API_KEY", ""),
+                model=os.getenv("WHISPER_MODEL", "whisper-1"),
+                normalize_audio=os.getenv("WHISPER_NORMALIZE_AUDIO", "false").lower() == "true",
+            ),
             default_provider=os.getenv("AI_PROVIDER", "gemini"),
             log_requests=os.getenv("AI_LOG_REQUESTS", "true").lower() == "true",
             log_responses=os.getenv("AI_LOG_RESPONSES", "true").lower() == "true",
@@ -99,3 +134,28 @@ class AIServiceConfig:
 # Global config instance
 ai_config = AIServiceConfig.from_env()
 
+# Callbacks run with the new config after reload_config()
+_reload_hooks: List[Callable[[AIServiceConfig], None]] = []
+
+
+def on_reload(hook: Callable[[AIServiceConfig], None]) -> Callable[[AIServiceConfig], None]:
+    """Register a hook that rebuilds state derived from the global config."""
+    _reload_hooks.append(hook)
+    return hook
+
+
+def reload_config() -> AIServiceConfig:
+    """
+    Re-read environment variables and replace the global config.
+    
+    Service singletons register reset hooks with on_reload(), so they
+    pick up the new keys, models and timeouts on their next call. Code
+    outside the services should read ``config.ai_config`` at call time
+    rather than importing ``ai_config`` by name.
+    """
+    global ai_config
+    ai_config = AIServiceConfig.from_env()
+    for hook in _reload_hooks:
+        hook(ai_config)
+    return ai_config
+
@@ -2,6 +2,8 @@
 Custom exceptions for AI services.
 """
 
+import warnings
+
 
 class AIServiceError(Exception):
     """Base exception for AI service errors."""
@@ -40,8 +42,14 @@ class AIServiceConfigError(AIServiceError):
 class RateLimitError(AIServiceError):
     """Rate limit exceeded."""
     
-    def __init__(self, message: str = "Đã vượt quá giới hạn request. Vui lòng thử lại sau."):
+    def __init__(
+        self,
+        message: str = "Đã vượt quá giới hạn request. Vui lòng thử lại sau.",
+        retry_after: float = None,
+    ):
         super().__init__(message, code="RATE_LIMIT_ERROR")
+        # Seconds the provider asked us to wait (Retry-After), if known
+        self.retry_after = retry_after
 
 
 # Alias for compatibility
@@ -69,17 +77,13 @@ class ContentFilterError(AIServiceError):
         super().__init__(message, code="CONTENT_FILTERED")
 
 
-class TimeoutError(AIServiceError):
+class AIServiceTimeoutError(AIServiceError):
     """Request timeout."""
     
     def __init__(self, message: str = "Request đã hết thời gian chờ. Vui lòng thử lại."):
         super().__init__(message, code="TIMEOUT_ERROR")
 
 
-# Alias for compatibility
-AIServiceTimeoutError = TimeoutError
-
-
 class NetworkError(AIServiceError):
     """Network connectivity error."""
     
@@ -114,3 +118,15 @@ class TranscriptionError(AIServiceError):
     def __init__(self, message: str = "Lỗi chuyển đổi giọng nói thành văn bản.", details: dict = None):
         super().__init__(message, code="TRANSCRIPTION_ERROR", details=details)
 
+
+def __getattr__(name):
+    # Deprecated alias: the old name shadowed the builtin TimeoutError
+    if name == "TimeoutError":
+        warnings.warn(
+            "ai_services.exceptions.TimeoutError is deprecated, "
+            "use AIServiceTimeoutError instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return AIServiceTimeoutError
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
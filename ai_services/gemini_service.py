@@ -4,9 +4,13 @@ Gemini AI Service Implementation.
 Provides the main interface for interacting with Google's Gemini API.
 """
 
+import dataclasses
+import hashlib
 import logging
+import threading
 import time
-from typing import Optional, Generator, List
+from collections import OrderedDict
+from typing import AsyncGenerator, Callable, Dict, Optional, Generator, List, NoReturn, Tuple
 
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
@@ -14,11 +18,12 @@ from google.api_core import exceptions as google_exceptions
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
     retry_if_exception_type,
 )
 
-from .config import GeminiConfig, ai_config
+from . import config as ai_config_module
+from .config import GeminiConfig
 from .exceptions import (
     AIServiceError,
     APIKeyError,
@@ -26,13 +31,12 @@ from .exceptions import (
     QuotaExceededError,
     ModelError,
     ContentFilterError,
-    TimeoutError,
+    AIServiceTimeoutError,
     NetworkError,
     GenerationError,
 )
 from .models import (
     ChatMessage,
-    MessageRole,
     PersonaContext,
     GenerationParams,
     GenerationRequest,
@@ -43,6 +47,112 @@ from .models import (
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of per-system-instruction models kept alive
+_MODEL_CACHE_SIZE = 32
+
+
+# Transient errors worth retrying
+_RETRYABLE_ERRORS = (
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.InternalServerError,
+    google_exceptions.TooManyRequests,
+    AIServiceTimeoutError,
+)
+
+
+def _stop_after_configured_attempts(retry_state) -> bool:
+    """Stop after ``config.max_retries`` attempts of the bound service."""
+    config = retry_state.args[0].config
+    return stop_after_attempt(config.max_retries)(retry_state)
+
+
+def _wait_full_jitter(retry_state) -> float:
+    """
+    Full-jitter exponential backoff bounded by the service config.
+    
+    Randomizing the whole interval keeps concurrent clients that hit
+    the same 429/503 from retrying in lockstep.
+    """
+    config = retry_state.args[0].config
+    return wait_random_exponential(
+        multiplier=config.retry_min_wait,
+        max=config.retry_max_wait,
+    )(retry_state)
+
+
+# genai.configure rebuilds the SDK clients (and drops their pooled
+# connections), so it is called once per process per key/transport.
+_configure_lock = threading.Lock()
+_configured_with: Optional[Tuple[str, Optional[str]]] = None
+
+
+def _configure_client(api_key: str, transport: Optional[str]) -> None:
+    """Configure the Gemini SDK unless it already uses these settings."""
+    global _configured_with
+    
+    with _configure_lock:
+        if _configured_with == (api_key, transport):
+            return
+        genai.configure(api_key=api_key, transport=transport)
+        _configured_with = (api_key, transport)
+
+
+_with_retry = retry(
+    stop=_stop_after_configured_attempts,
+    wait=_wait_full_jitter,
+    retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+    before_sleep=lambda retry_state: logger.warning(
+        "Retrying Gemini request, attempt %d", retry_state.attempt_number
+    ),
+    reraise=True,
+)
+
+
+def _noop() -> None:
+    """Stand-in for GeminiService._initialize once it has succeeded."""
+
+
+# ===================== ERROR MAPPING =====================
+
+def _raise_invalid_argument(error_str: str, error: Exception) -> NoReturn:
+    if "api key" in error_str or "api_key" in error_str:
+        raise APIKeyError()
+    raise GenerationError(f"Request không hợp lệ: {error}")
+
+
+def _raise_permission_denied(error_str: str, error: Exception) -> NoReturn:
+    raise APIKeyError("API key không có quyền truy cập.")
+
+
+def _raise_resource_exhausted(error_str: str, error: Exception) -> NoReturn:
+    if "quota" in error_str:
+        raise QuotaExceededError()
+    raise RateLimitError()
+
+
+def _raise_timeout(error_str: str, error: Exception) -> NoReturn:
+    raise AIServiceTimeoutError()
+
+
+def _raise_unavailable(error_str: str, error: Exception) -> NoReturn:
+    raise NetworkError("Dịch vụ Gemini tạm thời không khả dụng.")
+
+
+def _raise_server_error(error_str: str, error: Exception) -> NoReturn:
+    raise GenerationError("Lỗi server Gemini. Vui lòng thử lại.")
+
+
+_ERROR_DISPATCH: Dict[type, Callable[[str, Exception], NoReturn]] = {
+    google_exceptions.InvalidArgument: _raise_invalid_argument,
+    google_exceptions.PermissionDenied: _raise_permission_denied,
+    google_exceptions.ResourceExhausted: _raise_resource_exhausted,
+    google_exceptions.TooManyRequests: _raise_resource_exhausted,
+    google_exceptions.DeadlineExceeded: _raise_timeout,
+    google_exceptions.ServiceUnavailable: _raise_unavailable,
+    google_exceptions.InternalServerError: _raise_server_error,
+}
+
 
 class GeminiService:
     """
@@ -52,15 +162,32 @@ class GeminiService:
     - Text generation with conversation history
     - Persona-based chat
     - Streaming support
-    - Retry with exponential backoff
+    - Retry with full-jitter exponential backoff
     - Comprehensive error handling
     """
     
     def __init__(self, config: Optional[GeminiConfig] = None):
         """Initialize the Gemini service."""
-        self.config = config or ai_config.gemini
+        self.config = config or ai_config_module.ai_config.gemini
         self._model = None
+        self._safety_settings = None
         self._initialized = False
+        self._model_cache: "OrderedDict[bytes, genai.GenerativeModel]" = OrderedDict()
+        self._model_cache_lock = threading.Lock()
+        self._response_cache: "OrderedDict[bytes, Tuple[float, GenerationResponse]]" = OrderedDict()
+        self._response_cache_lock = threading.Lock()
+    
+    def reset(self, config: GeminiConfig) -> None:
+        """Switch to a new config, dropping the client and every cached model and reply."""
+        with self._model_cache_lock, self._response_cache_lock:
+            self.config = config
+            self._model = None
+            self._safety_settings = None
+            self._initialized = False
+            # Undo the _noop shortcut installed by _initialize
+            self.__dict__.pop("_initialize", None)
+            self._model_cache.clear()
+            self._response_cache.clear()
         
     def _initialize(self) -> None:
         """Initialize the Gemini client."""
@@ -71,7 +198,7 @@ class GeminiService:
             raise APIKeyError("GEMINI_API_KEY chưa được cấu hình trong environment variables.")
         
         try:
-            genai.configure(api_key=self.config.api_key)
+            _configure_client(self.config.api_key, self.config.transport)
             
             # Configure safety settings
             safety_settings = None
@@ -83,81 +210,151 @@ class GeminiService:
                     HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_NONE,
                 }
             
+            self._safety_settings = safety_settings
             self._model = genai.GenerativeModel(
                 model_name=self.config.model,
                 safety_settings=safety_settings,
             )
             self._initialized = True
+            # Later calls skip the check entirely
+            self._initialize = _noop
             
-            logger.info(f"Gemini service initialized with model: {self.config.model}")
+            logger.info("Gemini service initialized with model: %s", self.config.model)
             
         except Exception as e:
-            logger.error(f"Failed to initialize Gemini service: {e}")
+            logger.error("Failed to initialize Gemini service: %s", e)
             raise ModelError(f"Không thể khởi tạo Gemini: {str(e)}")
     
-    def _build_chat_history(self, messages: List[ChatMessage]) -> List[dict]:
-        """Convert messages to Gemini format."""
-        history = []
+    def _get_model(self, system_instruction: Optional[str]):
+        """
+        Return a model bound to ``system_instruction``, reusing cached ones.
+        
+        Instructions are keyed by their blake2b digest so long system
+        prompts aren't retained as dict keys. Least recently used models
+        are evicted beyond _MODEL_CACHE_SIZE.
+        """
+        if not system_instruction:
+            return self._model
+        
+        key = hashlib.blake2b(
+            system_instruction.encode("utf-8"), digest_size=16
+        ).digest()
+        
+        with self._model_cache_lock:
+            model = self._model_cache.get(key)
+            if model is not None:
+                self._model_cache.move_to_end(key)
+                return model
+            
+            model = genai.GenerativeModel(
+                model_name=self.config.model,
+                system_instruction=system_instruction,
+            )
+            self._model_cache[key] = model
+            if len(self._model_cache) > _MODEL_CACHE_SIZE:
+                self._model_cache.popitem(last=False)
+            return model
+    
+    def _cache_key(self, request: GenerationRequest) -> Optional[bytes]:
+        """
+        Key for the response cache, or None if the request isn't cacheable.
         
-        for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                # Gemini doesn't have system role, prepend to first user message
-                continue
-            history.append(msg.to_gemini_format())
+        Only temperature == 0 requests are cached: replaying a sampled
+        response would be semantically wrong.
+        """
+        if request.params.temperature != 0 or self.config.response_cache_size <= 0:
+            return None
         
-        return history
+        canonical = repr((
+            self.config.model,
+            request.persona.build_system_message() if request.persona else None,
+            [(msg.role.value, msg.content) for msg in request.history],
+            request.prompt,
+            request.params.to_gemini_config(),
+        ))
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
     
-    def _get_system_instruction(self, messages: List[ChatMessage]) -> Optional[str]:
-        """Extract system instruction from messages."""
-        for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                return msg.content
-        return None
+    def _cache_get(self, key: Optional[bytes]) -> Optional[GenerationResponse]:
+        """Return a cached response marked ``cached=True``, if still fresh."""
+        if key is None:
+            return None
+        
+        with self._response_cache_lock:
+            entry = self._response_cache.get(key)
+            if entry is None:
+                return None
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                del self._response_cache[key]
+                return None
+            self._response_cache.move_to_end(key)
+        
+        return dataclasses.replace(response, cached=True)
+    
+    def _cache_put(self, key: Optional[bytes], response: GenerationResponse) -> None:
+        """Store a response, evicting least recently used entries."""
+        if key is None:
+            return
+        
+        expires_at = time.monotonic() + self.config.response_cache_ttl
+        with self._response_cache_lock:
+            self._response_cache[key] = (expires_at, response)
+            self._response_cache.move_to_end(key)
+            while len(self._response_cache) > self.config.response_cache_size:
+                self._response_cache.popitem(last=False)
     
     def _handle_error(self, error: Exception) -> None:
         """Convert Google API errors to our custom exceptions."""
         error_str = str(error).lower()
         
-        if isinstance(error, google_exceptions.InvalidArgument):
-            if "api key" in error_str or "api_key" in error_str:
-                raise APIKeyError()
-            raise GenerationError(f"Request không hợp lệ: {error}")
+        # Most specific registered class wins, so subclasses keep their mapping
+        for error_type in type(error).__mro__:
+            handler = _ERROR_DISPATCH.get(error_type)
+            if handler is not None:
+                handler(error_str, error)
         
-        elif isinstance(error, google_exceptions.PermissionDenied):
-            raise APIKeyError("API key không có quyền truy cập.")
+        if "blocked" in error_str or "safety" in error_str:
+            raise ContentFilterError()
         
-        elif isinstance(error, google_exceptions.ResourceExhausted):
-            if "quota" in error_str:
-                raise QuotaExceededError()
-            raise RateLimitError()
+        raise GenerationError(f"Lỗi không xác định: {error}")
+    
+    def _to_response(self, response, latency_ms: float) -> GenerationResponse:
+        """Build a GenerationResponse from a completed Gemini response."""
+        content = response.text
         
-        elif isinstance(error, google_exceptions.DeadlineExceeded):
-            raise TimeoutError()
+        usage = getattr(response, "usage_metadata", None)
+        tokens_used = getattr(usage, "total_token_count", 0) if usage else 0
         
-        elif isinstance(error, google_exceptions.ServiceUnavailable):
-            raise NetworkError("Dịch vụ Gemini tạm thời không khả dụng.")
+        feedback = getattr(response, "prompt_feedback", None)
+        finish_reason = "content_filter" if feedback and feedback.block_reason else "stop"
         
-        elif isinstance(error, google_exceptions.InternalServerError):
-            raise GenerationError("Lỗi server Gemini. Vui lòng thử lại.")
+        logger.info(
+            "Gemini generation completed: tokens=%d, latency=%.0fms",
+            tokens_used, latency_ms,
+        )
         
-        elif "blocked" in error_str or "safety" in error_str:
-            raise ContentFilterError()
+        return GenerationResponse(
+            content=content,
+            finish_reason=finish_reason,
+            tokens_used=tokens_used,
+            model=self.config.model,
+            latency_ms=latency_ms,
+        )
+    
+    @_with_retry
+    def _send_message(self, chat, prompt: str, generation_config: dict, stream: bool = False):
+        """
+        Send a chat message, retrying transient failures.
         
-        else:
-            raise GenerationError(f"Lỗi không xác định: {error}")
+        Raw Google exceptions propagate to tenacity here; callers translate
+        them with _handle_error only after retries are exhausted.
+        """
+        return chat.send_message(
+            prompt,
+            generation_config=generation_config,
+            stream=stream,
+        )
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((
-            google_exceptions.ServiceUnavailable,
-            google_exceptions.DeadlineExceeded,
-            google_exceptions.InternalServerError,
-        )),
-        before_sleep=lambda retry_state: logger.warning(
-            f"Retrying Gemini request, attempt {retry_state.attempt_number}"
-        ),
-    )
     def generate_reply(
         self,
         prompt: str,
@@ -190,66 +387,38 @@ class GeminiService:
             params=params or GenerationParams(),
         )
         
+        cache_key = self._cache_key(request)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
         start_time = time.time()
         
         try:
-            # Get full message history
-            full_history = request.get_full_history()
-            system_instruction = self._get_system_instruction(full_history)
+            system_instruction, chat_history, prompt = request.get_prepared()
             
-            # Create model with system instruction if provided
-            model = self._model
-            if system_instruction:
-                model = genai.GenerativeModel(
-                    model_name=self.config.model,
-                    system_instruction=system_instruction,
-                )
-            
-            # Build chat history (excluding system and last user message)
-            chat_history = self._build_chat_history(full_history[:-1])
+            model = self._get_model(system_instruction)
             
             # Create chat and send message
             chat = model.start_chat(history=chat_history)
             
-            response = chat.send_message(
+            response = self._send_message(
+                chat,
                 prompt,
-                generation_config=request.params.to_gemini_config(),
+                request.params.to_gemini_config(),
             )
             
             # Calculate latency
             latency_ms = (time.time() - start_time) * 1000
             
-            # Extract response
-            content = response.text
-            tokens_used = 0
-            
-            # Try to get token count
-            if hasattr(response, "usage_metadata"):
-                tokens_used = getattr(response.usage_metadata, "total_token_count", 0)
-            
-            # Determine finish reason
-            finish_reason = "stop"
-            if hasattr(response, "prompt_feedback"):
-                if response.prompt_feedback.block_reason:
-                    finish_reason = "content_filter"
-            
-            logger.info(
-                f"Gemini generation completed: "
-                f"tokens={tokens_used}, latency={latency_ms:.0f}ms"
-            )
-            
-            return GenerationResponse(
-                content=content,
-                finish_reason=finish_reason,
-                tokens_used=tokens_used,
-                model=self.config.model,
-                latency_ms=latency_ms,
-            )
+            result = self._to_response(response, latency_ms)
+            self._cache_put(cache_key, result)
+            return result
             
         except AIServiceError:
             raise
         except Exception as e:
-            logger.error(f"Gemini generation error: {e}")
+            logger.error("Gemini generation error: %s", e)
             self._handle_error(e)
     
     def generate_reply_stream(
@@ -286,32 +455,20 @@ class GeminiService:
         )
         
         try:
-            # Get full message history
-            full_history = request.get_full_history()
-            system_instruction = self._get_system_instruction(full_history)
-            
-            # Create model with system instruction if provided
-            model = self._model
-            if system_instruction:
-                model = genai.GenerativeModel(
-                    model_name=self.config.model,
-                    system_instruction=system_instruction,
-                )
+            system_instruction, chat_history, prompt = request.get_prepared()
             
-            # Build chat history
-            chat_history = self._build_chat_history(full_history[:-1])
+            model = self._get_model(system_instruction)
             
             # Create chat and stream response
             chat = model.start_chat(history=chat_history)
             
-            response = chat.send_message(
+            response = self._send_message(
+                chat,
                 prompt,
-                generation_config=request.params.to_gemini_config(),
+                request.params.to_gemini_config(),
                 stream=True,
             )
             
-            total_tokens = 0
-            
             for chunk in response:
                 if chunk.text:
                     yield StreamChunk(
@@ -321,8 +478,8 @@ class GeminiService:
                     )
             
             # Try to get final token count
-            if hasattr(response, "usage_metadata"):
-                total_tokens = getattr(response.usage_metadata, "total_token_count", 0)
+            usage = getattr(response, "usage_metadata", None)
+            total_tokens = getattr(usage, "total_token_count", 0) if usage else 0
             
             # Final chunk
             yield StreamChunk(
@@ -331,14 +488,33 @@ class GeminiService:
                 tokens_used=total_tokens,
             )
             
-            logger.info(f"Gemini streaming completed: tokens={total_tokens}")
+            logger.info("Gemini streaming completed: tokens=%d", total_tokens)
             
         except AIServiceError:
             raise
         except Exception as e:
-            logger.error(f"Gemini streaming error: {e}")
+            logger.error("Gemini streaming error: %s", e)
             self._handle_error(e)
     
+    @_with_retry
+    async def _agenerate(self, request: GenerationRequest):
+        """
+        Send a request through the SDK's native coroutine API.
+        
+        The chat wrapper is sync-only, so the history plus the current
+        prompt is passed as ``contents`` to generate_content_async.
+        """
+        system_instruction, contents, prompt = request.get_prepared()
+        contents.append({"role": "user", "parts": [{"text": prompt}]})
+        model = self._get_model(system_instruction)
+        
+        return await model.generate_content_async(
+            contents,
+            generation_config=request.params.to_gemini_config(),
+            safety_settings=self._safety_settings,
+            stream=request.stream,
+        )
+    
     async def generate_reply_async(
         self,
         prompt: str,
@@ -349,21 +525,102 @@ class GeminiService:
         """
         Async version of generate_reply.
         
-        Note: Uses sync API in thread pool as Gemini SDK doesn't have native async.
+        Uses the SDK's native async client so concurrent requests share the
+        event loop instead of each holding a thread-pool worker.
+        """
+        self._initialize()
+        
+        request = GenerationRequest(
+            prompt=prompt,
+            history=history or [],
+            persona=persona,
+            params=params or GenerationParams(),
+        )
+        
+        cache_key = self._cache_key(request)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
+        
+        start_time = time.time()
+        
+        try:
+            response = await self._agenerate(request)
+            latency_ms = (time.time() - start_time) * 1000
+            
+            result = self._to_response(response, latency_ms)
+            self._cache_put(cache_key, result)
+            return result
+            
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error("Gemini async generation error: %s", e)
+            self._handle_error(e)
+    
+    async def generate_reply_stream_async(
+        self,
+        prompt: str,
+        history: Optional[List[ChatMessage]] = None,
+        persona: Optional[PersonaContext] = None,
+        params: Optional[GenerationParams] = None,
+    ) -> AsyncGenerator[StreamChunk, None]:
+        """
+        Async version of generate_reply_stream.
+        
+        Each chunk is yielded as soon as Gemini emits it; the final chunk
+        carries the token count once the response has been resolved.
         """
-        import asyncio
+        self._initialize()
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.generate_reply(prompt, history, persona, params)
+        request = GenerationRequest(
+            prompt=prompt,
+            history=history or [],
+            persona=persona,
+            params=params or GenerationParams(),
+            stream=True,
         )
+        
+        try:
+            response = await self._agenerate(request)
+            
+            async for chunk in response:
+                if chunk.text:
+                    yield StreamChunk(
+                        content=chunk.text,
+                        is_final=False,
+                        tokens_used=0,
+                    )
+            
+            await response.resolve()
+            
+            usage = getattr(response, "usage_metadata", None)
+            total_tokens = getattr(usage, "total_token_count", 0) if usage else 0
+            
+            yield StreamChunk(
+                content="",
+                is_final=True,
+                tokens_used=total_tokens,
+            )
+            
+            logger.info("Gemini async streaming completed: tokens=%d", total_tokens)
+            
+        except AIServiceError:
+            raise
+        except Exception as e:
+            logger.error("Gemini async streaming error: %s", e)
+            self._handle_error(e)
 
 
 # Global service instance
 gemini_service = GeminiService()
 
 
+@ai_config_module.on_reload
+def _reset_gemini_service(config) -> None:
+    gemini_service.reset(config.gemini)
+
+
 def generate_reply(
     prompt: str,
     history: Optional[List[ChatMessage]] = None,
@@ -3,7 +3,7 @@ Data models for AI service requests and responses.
 """
 
 from dataclasses import dataclass, field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from enum import Enum
 
 
@@ -14,21 +14,35 @@ class MessageRole(str, Enum):
     SYSTEM = "system"
 
 
-@dataclass
+# Gemini uses 'user' and 'model' for roles
+_GEMINI_ROLE = {
+    MessageRole.USER: "user",
+    MessageRole.ASSISTANT: "model",
+    MessageRole.SYSTEM: "system",
+}
+
+
+@dataclass(slots=True)
 class ChatMessage:
     """A single message in the conversation."""
     
     role: MessageRole
     content: str
     
-    def to_gemini_format(self) -> Dict[str, str]:
-        """Convert to Gemini API format."""
-        # Gemini uses 'user' and 'model' for roles
-        role = "model" if self.role == MessageRole.ASSISTANT else self.role.value
-        return {
-            "role": role,
-            "parts": [{"text": self.content}]
-        }
+    # Gemini-format dict, built on first use
+    _gemini_cache: Optional[Dict[str, Any]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    def to_gemini_format(self) -> Dict[str, Any]:
+        """Convert to Gemini API format (cached per message)."""
+        cached = self._gemini_cache
+        if cached is None:
+            cached = self._gemini_cache = {
+                "role": _GEMINI_ROLE[self.role],
+                "parts": [{"text": self.content}]
+            }
+        return cached
     
     @classmethod
     def from_dict(cls, data: Dict[str, str]) -> "ChatMessage":
@@ -37,7 +51,7 @@ class ChatMessage:
         return cls(role=role, content=data.get("content", ""))
 
 
-@dataclass
+@dataclass(slots=True)
 class PersonaContext:
     """Persona information for conversation context."""
     
@@ -52,11 +66,19 @@ class PersonaContext:
     child_grade: str = ""
     system_prompt: str = ""
     
+    # Generated system message, built on first use
+    _cached_system: Optional[str] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
     def build_system_message(self) -> str:
-        """Build the system message for the AI."""
+        """Build the system message for the AI (memoized per instance)."""
         if self.system_prompt:
             return self.system_prompt
         
+        if self._cached_system is not None:
+            return self._cached_system
+        
         # Auto-generate system prompt if not provided
         prompt_parts = [
             f"Bạn đang đóng vai một phụ huynh tên là {self.name}.",
@@ -87,7 +109,8 @@ class PersonaContext:
             "Luôn duy trì vai diễn và không phá vỡ nhân vật.",
         ])
         
-        return "\n".join(prompt_parts)
+        self._cached_system = "\n".join(prompt_parts)
+        return self._cached_system
     
     @classmethod
     def from_persona_model(cls, persona) -> "PersonaContext":
@@ -106,7 +129,7 @@ class PersonaContext:
         )
 
 
-@dataclass 
+@dataclass(slots=True)
 class GenerationParams:
     """Parameters for text generation."""
     
@@ -129,7 +152,7 @@ class GenerationParams:
         return config
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationRequest:
     """Request for text generation."""
     
@@ -139,26 +162,30 @@ class GenerationRequest:
     params: GenerationParams = field(default_factory=GenerationParams)
     stream: bool = False
     
-    def get_full_history(self) -> List[ChatMessage]:
-        """Get history with system message prepended if persona exists."""
-        messages = []
-        
-        if self.persona:
-            system_msg = ChatMessage(
-                role=MessageRole.SYSTEM,
-                content=self.persona.build_system_message()
-            )
-            messages.append(system_msg)
+    def get_prepared(self) -> Tuple[Optional[str], List[Dict[str, Any]], str]:
+        """
+        Prepare the request for Gemini in a single pass over history.
         
-        messages.extend(self.history)
+        Returns:
+            (system_instruction, gemini_history, prompt) where the history
+            excludes system messages and the current prompt. The persona's
+            system message takes precedence over one found in history.
+        """
+        system_instruction = self.persona.build_system_message() if self.persona else None
+        gemini_history = []
         
-        # Add current prompt
-        messages.append(ChatMessage(role=MessageRole.USER, content=self.prompt))
+        for msg in self.history:
+            if msg.role is MessageRole.SYSTEM:
+                # Gemini has no system role in chat history
+                if system_instruction is None:
+                    system_instruction = msg.content
+                continue
+            gemini_history.append(msg.to_gemini_format())
         
-        return messages
+        return system_instruction, gemini_history, self.prompt
 
 
-@dataclass
+@dataclass(slots=True)
 class GenerationResponse:
     """Response from text generation."""
     
@@ -183,7 +210,7 @@ class GenerationResponse:
         }
 
 
-@dataclass
+@dataclass(slots=True)
 class StreamChunk:
     """A chunk of streamed response."""
     
@@ -3,21 +3,156 @@ Serializers for AI Services API.
 """
 
 from rest_framework import serializers
+from rest_framework.fields import empty
+
+from .models import MessageRole
+
+
+_MESSAGE_ROLES = ("user", "assistant", "system")
+_MESSAGE_ROLE_SET = frozenset(_MESSAGE_ROLES)
+
+_MAX_PROMPT_LEN = 10000
+
+# Role value -> MessageRole, skipping Enum.__call__ per history message
+_ROLE_MAP = MessageRole._value2member_map_
+
+
+def _is_plain_text(value: str) -> bool:
+    """Check what DRF's null-character and surrogate validators check."""
+    if "\x00" in value:
+        return False
+    if value.isascii():
+        return True
+    try:
+        value.encode("utf-8")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+class _RoleField(serializers.ChoiceField):
+    """ChoiceField that validates straight to a MessageRole member."""
+    
+    def to_internal_value(self, data):
+        role = _ROLE_MAP.get(str(data))
+        if role is None:
+            self.fail("invalid_choice", input=data)
+        return role
 
 
 class ChatMessageSerializer(serializers.Serializer):
     """Serializer for a chat message in AI context."""
     
-    role = serializers.ChoiceField(
-        choices=["user", "assistant", "system"],
+    role = _RoleField(
+        choices=_MESSAGE_ROLES,
         help_text="Vai trò của người gửi"
     )
     content = serializers.CharField(
         help_text="Nội dung tin nhắn"
     )
+    
+    def to_internal_value(self, data):
+        """
+        Validate a well-formed message inline, without per-field dispatch.
+        
+        This runs once per history entry, so the common case skips DRF's
+        field machinery; anything unusual falls back to the regular path
+        for its error messages.
+        """
+        if type(data) is dict:
+            role = data.get("role")
+            content = data.get("content")
+            if type(role) is str and role in _MESSAGE_ROLE_SET and type(content) is str:
+                content = content.strip()
+                if content and _is_plain_text(content):
+                    return {"role": _ROLE_MAP[role], "content": content}
+        
+        return super().to_internal_value(data)
 
 
-class PersonaContextSerializer(serializers.Serializer):
+def _plan_kind(field):
+    """Field class handled by the fast path, or None to always defer to DRF."""
+    if getattr(field, "max_length", None) or getattr(field, "min_length", None):
+        return None
+    return type(field)
+
+
+class PlannedSerializer(serializers.Serializer):
+    """
+    Serializer for flat scalar fields, validated from a cached field plan.
+    
+    The plan is built once per class from the declared fields. Clean
+    values are checked in a single loop; anything else falls back to DRF
+    for the regular error messages.
+    """
+    
+    @classmethod
+    def get_field_plan(cls):
+        """Return the (memoized) validation plan for this class."""
+        plan = cls.__dict__.get("_field_plan")
+        if plan is None:
+            plan = cls._field_plan = tuple(
+                (
+                    name,
+                    _plan_kind(field),
+                    field.required,
+                    field.default,
+                    getattr(field, "min_value", None),
+                    getattr(field, "max_value", None),
+                    field.allow_null,
+                    getattr(field, "allow_blank", False),
+                )
+                for name, field in cls._declared_fields.items()
+            )
+        return plan
+    
+    def to_internal_value(self, data):
+        if type(data) is not dict:
+            return super().to_internal_value(data)
+        
+        validated = {}
+        for (name, kind, required, default, min_value, max_value,
+             allow_null, allow_blank) in self.get_field_plan():
+            value = data.get(name, empty)
+            
+            if value is empty:
+                if required:
+                    return super().to_internal_value(data)
+                if default is not empty:
+                    validated[name] = default
+                continue
+            
+            if value is None:
+                if not allow_null:
+                    return super().to_internal_value(data)
+            elif kind is serializers.CharField:
+                if type(value) is not str or not _is_plain_text(value):
+                    return super().to_internal_value(data)
+                value = value.strip()
+                if not value and not allow_blank:
+                    return super().to_internal_value(data)
+            elif kind is serializers.IntegerField:
+                if type(value) is not int:
+                    return super().to_internal_value(data)
+            elif kind is serializers.FloatField:
+                if type(value) is not float and type(value) is not int:
+                    return super().to_internal_value(data)
+                value = float(value)
+            else:
+                return super().to_internal_value(data)
+            
+            if value is not None and (
+                (min_value is not None and value < min_value)
+                or (max_value is not None and value > max_value)
+            ):
+                return super().to_internal_value(data)
+            
+            validated[name] = value
+        
+        return validated
+
+
+class PersonaContextSerializer(PlannedSerializer):
     """Serializer for persona context."""
     
     name = serializers.CharField(
@@ -81,7 +216,7 @@ class PersonaContextSerializer(serializers.Serializer):
     )
 
 
-class GenerationParamsSerializer(serializers.Serializer):
+class GenerationParamsSerializer(PlannedSerializer):
     """Serializer for generation parameters."""
     
     max_tokens = serializers.IntegerField(
@@ -139,11 +274,13 @@ class ChatRequestSerializer(serializers.Serializer):
     
     def validate_prompt(self, value):
         """Validate prompt is not empty."""
-        value = value.strip()
+        # CharField already trims; only strip again if edge whitespace remains
+        if value and (value[0].isspace() or value[-1].isspace()):
+            value = value.strip()
         if not value:
             raise serializers.ValidationError("Prompt không được để trống.")
-        if len(value) > 10000:
-            raise serializers.ValidationError("Prompt không được quá 10000 ký tự.")
+        if len(value) > _MAX_PROMPT_LEN:
+            raise serializers.ValidationError(f"Prompt không được quá {_MAX_PROMPT_LEN} ký tự.")
         return value
 
 
@@ -152,13 +289,23 @@ class ChatStreamRequestSerializer(ChatRequestSerializer):
     pass
 
 
-class ChatResponseSerializer(serializers.Serializer):
-    """Serializer for chat response."""
+class ChatBatchRequestSerializer(serializers.Serializer):
+    """Serializer for batched chat request sharing one persona/params."""
     
-    success = serializers.BooleanField()
-    data = serializers.DictField(
-        child=serializers.CharField(),
-        help_text="Response data"
+    prompts = serializers.ListField(
+        child=serializers.CharField(max_length=_MAX_PROMPT_LEN),
+        min_length=1,
+        max_length=32,
+        help_text="Danh sách prompt (tối đa 32)"
+    )
+    persona = PersonaContextSerializer(
+        required=False,
+        allow_null=True,
+        help_text="Thông tin persona"
+    )
+    params = GenerationParamsSerializer(
+        required=False,
+        help_text="Tham số generation"
     )
 
 
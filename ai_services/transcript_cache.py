@@ -0,0 +1,258 @@
+"""
+On-disk transcription cache.
+
+Content-addressed cache in front of WhisperService:
+- Key: SHA-256 of the audio plus model, response format, language and prompt
+- Value: JSON envelope of the TranscriptionResult (the user's transcript text)
+- Location: $XDG_CACHE_HOME/mindx/whisper (default ~/.cache/mindx/whisper)
+
+Entries hold users' speech transcripts, so the cache is opt-in: set
+MINDX_TRANSCRIPT_CACHE=1 to enable it. Entries older than
+MINDX_TRANSCRIPT_CACHE_MAX_AGE seconds (default 7 days) are ignored and
+pruned, and at most MINDX_TRANSCRIPT_CACHE_MAX_ENTRIES (default 10000)
+are kept, oldest removed first.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import itertools
+import tempfile
+from pathlib import Path
+from typing import Optional, BinaryIO, Union
+
+from . import config as ai_config_module
+from .whisper_service import WhisperService, TranscriptionResult, get_whisper_service
+
+
+logger = logging.getLogger(__name__)
+
+# Audio is hashed in chunks of this size
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Prune the cache directory once every this many writes
+_PRUNE_EVERY = 100
+
+
+def default_cache_dir() -> Path:
+    """Get the cache directory, honoring XDG_CACHE_HOME."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(Path.home(), ".cache")
+    return Path(base) / "mindx" / "whisper"
+
+
+def cache_disabled() -> bool:
+    """Check whether the cache is off (unless MINDX_TRANSCRIPT_CACHE enables it)."""
+    return os.environ.get("MINDX_TRANSCRIPT_CACHE", "").lower() not in ("1", "true", "yes")
+
+
+def _buffer_unseekable(audio_data: Union[bytes, BinaryIO]) -> Union[bytes, BinaryIO]:
+    """Read non-seekable streams into bytes so they can be hashed and uploaded."""
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        return audio_data
+    seekable = getattr(audio_data, "seekable", None)
+    if seekable is None or not seekable():
+        return audio_data.read()
+    return audio_data
+
+
+def _hash_audio(digest, audio_data: Union[bytes, BinaryIO]) -> None:
+    """Feed the audio into a hashlib digest without copying it whole."""
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        view = memoryview(audio_data)
+        for offset in range(0, len(view), _HASH_CHUNK_SIZE):
+            digest.update(view[offset:offset + _HASH_CHUNK_SIZE])
+        return
+    
+    # File-like: hash from the start, then rewind for the upload
+    position = audio_data.tell()
+    audio_data.seek(0)
+    while chunk := audio_data.read(_HASH_CHUNK_SIZE):
+        digest.update(chunk)
+    audio_data.seek(position)
+
+
+class CachedTranscriber:
+    """
+    Read-through transcription cache wrapping WhisperService.transcribe.
+    
+    Cache failures (unreadable or unwritable files) are logged and treated
+    as misses, so the cache never breaks transcription.
+    """
+    
+    def __init__(
+        self,
+        service: Optional[WhisperService] = None,
+        cache_dir: Optional[Path] = None,
+        max_entries: Optional[int] = None,
+        max_age: Optional[float] = None,
+    ):
+        """Initialize the cache."""
+        self.service = service or get_whisper_service()
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_entries = max_entries if max_entries is not None else int(
+            os.environ.get("MINDX_TRANSCRIPT_CACHE_MAX_ENTRIES", "10000")
+        )
+        self.max_age = max_age if max_age is not None else float(
+            os.environ.get("MINDX_TRANSCRIPT_CACHE_MAX_AGE", str(7 * 24 * 3600))
+        )
+        self._writes = itertools.count()
+    
+    def cache_key(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> str:
+        """Build the content-addressed key for a transcription request."""
+        config = self.service.config
+        digest = hashlib.sha256()
+        _hash_audio(digest, audio_data)
+        
+        for part in (
+            config.model,
+            config.response_format,
+            language or config.default_language,
+            prompt or "",
+        ):
+            digest.update(b"\0")
+            digest.update(part.encode())
+        
+        return digest.hexdigest()
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[TranscriptionResult]:
+        """Load a cached result, or None on a miss or an expired entry."""
+        try:
+            with open(self._path(key), "rb") as f:
+                if time.time() - os.fstat(f.fileno()).st_mtime > self.max_age:
+                    return None
+                return TranscriptionResult(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning("Ignoring unreadable transcript cache entry %s: %s", key, e)
+            return None
+    
+    def put(self, key: str, result: TranscriptionResult) -> None:
+        """Store a result, atomically replacing any existing entry."""
+        envelope = {
+            "text": result.text,
+            "language": result.language,
+            "duration": result.duration,
+            "segments": result.segments,
+            "words": result.words,
+        }
+        
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(envelope, f, ensure_ascii=False)
+                os.replace(tmp_path, self._path(key))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.warning("Could not write transcript cache entry %s: %s", key, e)
+            return
+        
+        if next(self._writes) % _PRUNE_EVERY == 0:
+            self.prune()
+    
+    def prune(self) -> int:
+        """
+        Delete expired entries, then the oldest beyond max_entries.
+        
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        kept = []
+        expired = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if not entry.name.endswith(".json"):
+                        continue
+                    try:
+                        mtime = entry.stat().st_mtime
+                    except OSError:
+                        continue
+                    if now - mtime > self.max_age:
+                        expired.append(entry.path)
+                    else:
+                        kept.append((mtime, entry.path))
+        except OSError as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning("Could not scan transcript cache %s: %s", self.cache_dir, e)
+            return 0
+        
+        excess = len(kept) - self.max_entries
+        if excess > 0:
+            kept.sort()
+            expired.extend(path for _, path in kept[:excess])
+        
+        removed = 0
+        for path in expired:
+            try:
+                os.unlink(path)
+                removed += 1
+            except OSError:
+                pass
+        
+        if removed:
+            logger.info("Pruned %s transcript cache entries", removed)
+        return removed
+    
+    def transcribe(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        filename: str = "audio.wav",
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+    ) -> TranscriptionResult:
+        """
+        Transcribe audio, serving repeats from the cache.
+        
+        Takes the same arguments as WhisperService.transcribe.
+        """
+        if cache_disabled():
+            return self.service.transcribe(audio_data, filename, language, prompt)
+        
+        # Hashing reads the stream, so one-shot streams must be buffered first
+        audio_data = _buffer_unseekable(audio_data)
+        key = self.cache_key(audio_data, language, prompt)
+        
+        cached = self.get(key)
+        if cached is not None:
+            logger.info("Transcript cache hit: %s", key[:12])
+            return cached
+        
+        result = self.service.transcribe(audio_data, filename, language, prompt)
+        self.put(key, result)
+        return result
+
+
+# ===================== SINGLETON INSTANCE =====================
+
+_cached_transcriber: Optional[CachedTranscriber] = None
+
+
+def get_cached_transcriber() -> CachedTranscriber:
+    """Get or create global cached transcriber instance."""
+    global _cached_transcriber
+    if _cached_transcriber is None:
+        _cached_transcriber = CachedTranscriber()
+    return _cached_transcriber
+
+
+@ai_config_module.on_reload
+def _reset_cached_transcriber(config) -> None:
+    # Drop the reference to the old WhisperService
+    global _cached_transcriber
+    _cached_transcriber = None
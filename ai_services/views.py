@@ -2,30 +2,270 @@
 API Views for AI Services.
 """
 
+import asyncio
 import logging
+import os
+from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
+
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.http import StreamingHttpResponse
+from asgiref.sync import async_to_sync
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
+from . import config as ai_config_module
 from .gemini_service import gemini_service
-from .whisper_service import get_whisper_service, TranscriptionResult
-from .models import ChatMessage, MessageRole, PersonaContext, GenerationParams
+from .transcript_cache import get_cached_transcriber
+from .models import ChatMessage, PersonaContext, GenerationParams
 from .exceptions import AIServiceError, AIServiceConfigError
 from .serializers import (
     ChatRequestSerializer,
-    ChatResponseSerializer,
+    ChatBatchRequestSerializer,
     ChatStreamRequestSerializer,
 )
 
 logger = logging.getLogger(__name__)
 
+try:
+    import orjson
+    
+    _jdumpb = orjson.dumps
+except ImportError:
+    import json
+    
+    def _jdumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+# Positional field order of PersonaContext / GenerationParams
+PERSONA_KEYS = (
+    "name", "personality_type", "description", "background",
+    "communication_style", "common_concerns", "child_name",
+    "child_age", "child_grade", "system_prompt",
+)
+_PERSONA_DEFAULTS = {
+    "name": "Phụ huynh",
+    "personality_type": "friendly",
+    "description": "",
+    "background": "",
+    "communication_style": "",
+    "common_concerns": "",
+    "child_name": "",
+    "child_age": None,
+    "child_grade": "",
+    "system_prompt": "",
+}
+_persona_args = itemgetter(*PERSONA_KEYS)
+
+PARAMS_KEYS = ("max_tokens", "temperature", "top_p", "top_k")
+_PARAMS_DEFAULTS = {
+    "max_tokens": 2048,
+    "temperature": 0.7,
+    "top_p": 0.95,
+    "top_k": 40,
+}
+_params_args = itemgetter(*PARAMS_KEYS)
+
+# SSE framing, pre-encoded so chunks are yielded as bytes
+_SSE_PREFIX = b"data: "
+_SSE_SUFFIX = b"\n\n"
+_DONE = b"data: [DONE]\n\n"
+
+
+# ===================== SWAGGER SCHEMAS =====================
+
+_TAGS = ["AI"]
+
+_ERROR_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        "error": openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                "code": openapi.Schema(type=openapi.TYPE_STRING),
+                "message": openapi.Schema(type=openapi.TYPE_STRING),
+            }
+        )
+    }
+)
+
+_ERROR_400 = openapi.Response(description="Request không hợp lệ", schema=_ERROR_SCHEMA)
+_ERROR_500 = openapi.Response(description="Lỗi AI service", schema=_ERROR_SCHEMA)
+
+_CHAT_RESPONSE = openapi.Response(
+    description="Phản hồi AI",
+    schema=openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            "success": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+            "data": openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    "content": openapi.Schema(type=openapi.TYPE_STRING),
+                    "finish_reason": openapi.Schema(type=openapi.TYPE_STRING),
+                    "tokens_used": openapi.Schema(type=openapi.TYPE_INTEGER),
+                    "model": openapi.Schema(type=openapi.TYPE_STRING),
+                    "latency_ms": openapi.Schema(type=openapi.TYPE_NUMBER),
+                    "cached": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                }
+            ),
+        }
+    )
+)
+
+_TRANSCRIBE_PARAMS = [
+    openapi.Parameter(
+        "audio",
+        openapi.IN_FORM,
+        type=openapi.TYPE_FILE,
+        required=True,
+        description="File audio (mp3, wav, webm, ogg, m4a, flac)"
+    ),
+    openapi.Parameter(
+        "language",
+        openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        required=False,
+        description="Mã ngôn ngữ (vi, en, etc.). Mặc định: vi"
+    ),
+    openapi.Parameter(
+        "prompt",
+        openapi.IN_FORM,
+        type=openapi.TYPE_STRING,
+        required=False,
+        description="Context prompt để hỗ trợ nhận dạng"
+    ),
+]
 
-class ChatView(APIView):
+
+def _build_call_args(data: dict):
+    """
+    Build generate_reply arguments from validated chat request data.
+    
+    Returns:
+        (prompt, history, persona, params)
+    """
+    # Build history (first turns usually have none)
+    history_data = data.get("history")
+    history = [
+        ChatMessage(role=msg["role"], content=msg["content"])
+        for msg in history_data
+    ] if history_data else ()
+    
+    persona, params = _build_context(data)
+    
+    return data["prompt"], history, persona, params
+
+
+def _build_context(data: dict):
+    """
+    Build the persona context and generation params from validated data.
+    
+    Returns:
+        (persona, params)
+    """
+    # Build persona context
+    persona = None
+    if data.get("persona"):
+        persona = PersonaContext(*_persona_args(ChainMap(data["persona"], _PERSONA_DEFAULTS)))
+    
+    # Build params
+    params = GenerationParams(*_params_args(ChainMap(data.get("params", {}), _PARAMS_DEFAULTS)))
+    
+    return persona, params
+
+
+# Shared pool for batch fan-out under WSGI, sized to the batch cap
+_BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=32, thread_name_prefix="ai-batch")
+
+
+def _served_over_asgi(request) -> bool:
+    """
+    Whether the request is being served by an ASGI server's event loop.
+    
+    Sync views run in a worker thread under both servers, so when no
+    loop is running in this thread fall back to the WSGI environ, which
+    ASGI requests never carry.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return "wsgi.input" not in request.META
+    return True
+
+
+async def _generate_batch(prompts, persona, params):
+    """Run all prompts concurrently, returning results or exceptions in order."""
+    return await asyncio.gather(
+        *(
+            gemini_service.generate_reply_async(prompt=prompt, persona=persona, params=params)
+            for prompt in prompts
+        ),
+        return_exceptions=True,
+    )
+
+
+def _generate_batch_threaded(prompts, persona, params):
+    """
+    Run all prompts on the shared pool, returning results or exceptions in order.
+    
+    Under WSGI each async_to_sync call gets a fresh event loop, which the
+    SDK's process-wide async client cannot survive, so use the sync API.
+    """
+    futures = [
+        _BATCH_EXECUTOR.submit(gemini_service.generate_reply, prompt=prompt, persona=persona, params=params)
+        for prompt in prompts
+    ]
+    outcomes = []
+    for future in futures:
+        exc = future.exception()
+        outcomes.append(exc if exc is not None else future.result())
+    return outcomes
+
+
+def _envelope_exception_handler(exc, context):
+    """
+    Render validation errors in the AI envelope, delegating the rest.
+    
+    Keeps the {"error": {"code": "INVALID_REQUEST", ...}} shape the AI
+    endpoints have always returned for bad input.
+    """
+    if isinstance(exc, ValidationError):
+        return Response(
+            {"error": {"code": "INVALID_REQUEST", "message": "Dữ liệu không hợp lệ", "details": exc.detail}},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return api_settings.EXCEPTION_HANDLER(exc, context)
+
+
+# Permission instances are stateless, so share them across requests
+_PERM_AUTH = (IsAuthenticated(),)
+_PERM_NONE = ()
+
+
+class AIAPIView(APIView):
+    """
+    Base view for authenticated AI endpoints.
+    
+    Uses the shared permission instances and the AI error envelope.
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get_permissions(self):
+        return _PERM_AUTH
+    
+    def get_exception_handler(self):
+        return _envelope_exception_handler
+
+
+class ChatView(AIAPIView):
     """
     API endpoint for text-to-text chat with AI.
     
@@ -33,82 +273,28 @@ class ChatView(APIView):
     
     Generates a reply based on the prompt, history, and persona.
     """
-    permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
         operation_description="Tạo phản hồi AI từ prompt và context",
         request_body=ChatRequestSerializer,
         responses={
-            200: ChatResponseSerializer(),
-            400: openapi.Response(
-                description="Request không hợp lệ",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "error": openapi.Schema(
-                            type=openapi.TYPE_OBJECT,
-                            properties={
-                                "code": openapi.Schema(type=openapi.TYPE_STRING),
-                                "message": openapi.Schema(type=openapi.TYPE_STRING),
-                            }
-                        )
-                    }
-                )
-            ),
-            500: openapi.Response(description="Lỗi AI service"),
+            200: _CHAT_RESPONSE,
+            400: _ERROR_400,
+            500: _ERROR_500,
         },
-        tags=["AI"]
+        tags=_TAGS
     )
     def post(self, request):
         """Generate AI response."""
         serializer = ChatRequestSerializer(data=request.data)
-        
-        if not serializer.is_valid():
-            return Response(
-                {"error": {"code": "INVALID_REQUEST", "message": "Dữ liệu không hợp lệ", "details": serializer.errors}},
-                status=status.HTTP_400_BAD_REQUEST
-            )
-        
-        data = serializer.validated_data
+        serializer.is_valid(raise_exception=True)
         
         try:
-            # Build history
-            history = []
-            for msg in data.get("history", []):
-                history.append(ChatMessage(
-                    role=MessageRole(msg["role"]),
-                    content=msg["content"]
-                ))
-            
-            # Build persona context
-            persona = None
-            if data.get("persona"):
-                persona_data = data["persona"]
-                persona = PersonaContext(
-                    name=persona_data.get("name", "Phụ huynh"),
-                    personality_type=persona_data.get("personality_type", "friendly"),
-                    description=persona_data.get("description", ""),
-                    background=persona_data.get("background", ""),
-                    communication_style=persona_data.get("communication_style", ""),
-                    common_concerns=persona_data.get("common_concerns", ""),
-                    child_name=persona_data.get("child_name", ""),
-                    child_age=persona_data.get("child_age"),
-                    child_grade=persona_data.get("child_grade", ""),
-                    system_prompt=persona_data.get("system_prompt", ""),
-                )
-            
-            # Build params
-            params_data = data.get("params", {})
-            params = GenerationParams(
-                max_tokens=params_data.get("max_tokens", 2048),
-                temperature=params_data.get("temperature", 0.7),
-                top_p=params_data.get("top_p", 0.95),
-                top_k=params_data.get("top_k", 40),
-            )
+            prompt, history, persona, params = _build_call_args(serializer.validated_data)
             
             # Generate reply
             response = gemini_service.generate_reply(
-                prompt=data["prompt"],
+                prompt=prompt,
                 history=history,
                 persona=persona,
                 params=params,
@@ -120,20 +306,93 @@ class ChatView(APIView):
             })
             
         except AIServiceError as e:
-            logger.error(f"AI service error: {e.code} - {e.message}")
+            logger.error("AI service error: %s - %s", e.code, e.message)
             return Response(
                 e.to_dict(),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         except Exception as e:
-            logger.exception(f"Unexpected error in chat: {e}")
+            logger.exception("Unexpected error in chat: %s", e)
+            return Response(
+                {"error": {"code": "INTERNAL_ERROR", "message": "Lỗi hệ thống. Vui lòng thử lại."}},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class ChatBatchView(AIAPIView):
+    """
+    API endpoint for batched text-to-text chat with AI.
+    
+    POST /api/ai/chat/batch/
+    
+    Generates one reply per prompt, sharing persona and params across
+    the batch. Prompts run concurrently; each result reports its own
+    success or error.
+    """
+    
+    @swagger_auto_schema(
+        operation_description="Tạo nhiều phản hồi AI cùng persona và tham số",
+        request_body=ChatBatchRequestSerializer,
+        responses={
+            200: openapi.Response(
+                description="Kết quả theo thứ tự prompt",
+                schema=openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        "success": openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                        "results": openapi.Schema(
+                            type=openapi.TYPE_ARRAY,
+                            items=openapi.Schema(type=openapi.TYPE_OBJECT),
+                        ),
+                    }
+                )
+            ),
+            400: _ERROR_400,
+            500: _ERROR_500,
+        },
+        tags=_TAGS
+    )
+    def post(self, request):
+        """Generate AI responses for a batch of prompts."""
+        serializer = ChatBatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        
+        data = serializer.validated_data
+        
+        try:
+            persona, params = _build_context(data)
+            if _served_over_asgi(request):
+                outcomes = async_to_sync(_generate_batch)(data["prompts"], persona, params)
+            else:
+                outcomes = _generate_batch_threaded(data["prompts"], persona, params)
+        except Exception as e:
+            logger.exception("Unexpected error in batch chat: %s", e)
             return Response(
                 {"error": {"code": "INTERNAL_ERROR", "message": "Lỗi hệ thống. Vui lòng thử lại."}},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        
+        results = []
+        for outcome in outcomes:
+            if isinstance(outcome, AIServiceError):
+                logger.error("AI service error in batch: %s - %s", outcome.code, outcome.message)
+                results.append({"success": False, **outcome.to_dict()})
+            elif isinstance(outcome, BaseException):
+                logger.error("Unexpected error in batch item: %s", outcome)
+                results.append({
+                    "success": False,
+                    "error": {"code": "INTERNAL_ERROR", "message": "Lỗi hệ thống. Vui lòng thử lại."},
+                })
+            else:
+                results.append({"success": True, "data": outcome.to_dict()})
+        
+        return Response({
+            "success": True,
+            "results": results,
+        })
 
 
-class ChatStreamView(APIView):
+class ChatStreamView(AIAPIView):
     """
     API endpoint for streaming text-to-text chat with AI.
     
@@ -141,7 +400,6 @@ class ChatStreamView(APIView):
     
     Returns a streaming response with Server-Sent Events (SSE).
     """
-    permission_classes = [IsAuthenticated]
     
     @swagger_auto_schema(
         operation_description="Tạo phản hồi AI với streaming (SSE)",
@@ -150,70 +408,75 @@ class ChatStreamView(APIView):
             200: openapi.Response(
                 description="Stream response (text/event-stream)",
             ),
+            400: _ERROR_400,
+            500: _ERROR_500,
         },
-        tags=["AI"]
+        tags=_TAGS
     )
     def post(self, request):
         """Generate streaming AI response."""
         serializer = ChatStreamRequestSerializer(data=request.data)
-        
-        if not serializer.is_valid():
-            return Response(
-                {"error": {"code": "INVALID_REQUEST", "message": "Dữ liệu không hợp lệ", "details": serializer.errors}},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        serializer.is_valid(raise_exception=True)
         
         data = serializer.validated_data
         
         def event_stream():
             try:
-                # Build history
-                history = []
-                for msg in data.get("history", []):
-                    history.append(ChatMessage(
-                        role=MessageRole(msg["role"]),
-                        content=msg["content"]
-                    ))
+                prompt, history, persona, params = _build_call_args(data)
                 
-                # Build persona context
-                persona = None
-                if data.get("persona"):
-                    persona_data = data["persona"]
-                    persona = PersonaContext(
-                        name=persona_data.get("name", "Phụ huynh"),
-                        personality_type=persona_data.get("personality_type", "friendly"),
-                        description=persona_data.get("description", ""),
-                        system_prompt=persona_data.get("system_prompt", ""),
-                    )
+                # Stream response (chunk dicts built inline, no to_dict() per token)
+                for chunk in gemini_service.generate_reply_stream(
+                    prompt=prompt,
+                    history=history,
+                    persona=persona,
+                    params=params,
+                ):
+                    yield _SSE_PREFIX + _jdumpb({
+                        "content": chunk.content,
+                        "is_final": chunk.is_final,
+                        "tokens_used": chunk.tokens_used,
+                    }) + _SSE_SUFFIX
                 
-                # Build params
-                params_data = data.get("params", {})
-                params = GenerationParams(
-                    max_tokens=params_data.get("max_tokens", 2048),
-                    temperature=params_data.get("temperature", 0.7),
-                )
+                yield _DONE
                 
-                # Stream response
-                import json
-                for chunk in gemini_service.generate_reply_stream(
-                    prompt=data["prompt"],
+            except AIServiceError as e:
+                yield _SSE_PREFIX + _jdumpb(e.to_dict()) + _SSE_SUFFIX
+            except Exception as e:
+                yield _SSE_PREFIX + _jdumpb({"error": {"code": "STREAM_ERROR", "message": str(e)}}) + _SSE_SUFFIX
+        
+        async def aevent_stream():
+            try:
+                prompt, history, persona, params = _build_call_args(data)
+                
+                # Stream response on the event loop
+                async for chunk in gemini_service.generate_reply_stream_async(
+                    prompt=prompt,
                     history=history,
                     persona=persona,
                     params=params,
                 ):
-                    yield f"data: {json.dumps(chunk.to_dict())}\n\n"
+                    yield _SSE_PREFIX + _jdumpb({
+                        "content": chunk.content,
+                        "is_final": chunk.is_final,
+                        "tokens_used": chunk.tokens_used,
+                    }) + _SSE_SUFFIX
                 
-                yield "data: [DONE]\n\n"
+                yield _DONE
                 
             except AIServiceError as e:
-                import json
-                yield f"data: {json.dumps(e.to_dict())}\n\n"
+                yield _SSE_PREFIX + _jdumpb(e.to_dict()) + _SSE_SUFFIX
             except Exception as e:
-                import json
-                yield f"data: {json.dumps({'error': {'code': 'STREAM_ERROR', 'message': str(e)}})}\n\n"
+                yield _SSE_PREFIX + _jdumpb({"error": {"code": "STREAM_ERROR", "message": str(e)}}) + _SSE_SUFFIX
+        
+        # Under ASGI an async iterator streams without pinning a worker
+        # thread; WSGI servers can only consume a sync iterator
+        if _served_over_asgi(request):
+            stream = aevent_stream()
+        else:
+            stream = event_stream()
         
         response = StreamingHttpResponse(
-            event_stream(),
+            stream,
             content_type="text/event-stream"
         )
         response["Cache-Control"] = "no-cache"
@@ -221,7 +484,7 @@ class ChatStreamView(APIView):
         return response
 
 
-class TranscribeAudioView(APIView):
+class TranscribeAudioView(AIAPIView):
     """
     API endpoint for Speech-to-Text transcription using Whisper.
     
@@ -229,34 +492,11 @@ class TranscribeAudioView(APIView):
     
     Transcribes audio file to text.
     """
-    permission_classes = [IsAuthenticated]
     parser_classes = [MultiPartParser, FormParser]
     
     @swagger_auto_schema(
         operation_description="Chuyển đổi giọng nói thành văn bản (Speech-to-Text)",
-        manual_parameters=[
-            openapi.Parameter(
-                "audio",
-                openapi.IN_FORM,
-                type=openapi.TYPE_FILE,
-                required=True,
-                description="File audio (mp3, wav, webm, ogg, m4a, flac)"
-            ),
-            openapi.Parameter(
-                "language",
-                openapi.IN_FORM,
-                type=openapi.TYPE_STRING,
-                required=False,
-                description="Mã ngôn ngữ (vi, en, etc.). Mặc định: vi"
-            ),
-            openapi.Parameter(
-                "prompt",
-                openapi.IN_FORM,
-                type=openapi.TYPE_STRING,
-                required=False,
-                description="Context prompt để hỗ trợ nhận dạng"
-            ),
-        ],
+        manual_parameters=_TRANSCRIBE_PARAMS,
         responses={
             200: openapi.Response(
                 description="Transcription result",
@@ -270,10 +510,12 @@ class TranscribeAudioView(APIView):
                     }
                 )
             ),
-            400: openapi.Response(description="Invalid audio file"),
-            500: openapi.Response(description="Transcription error"),
+            400: _ERROR_400,
+            413: openapi.Response(description="File audio quá lớn", schema=_ERROR_SCHEMA),
+            415: openapi.Response(description="Định dạng audio không được hỗ trợ", schema=_ERROR_SCHEMA),
+            500: _ERROR_500,
         },
-        tags=["AI"]
+        tags=_TAGS
     )
     def post(self, request):
         """Transcribe audio to text."""
@@ -285,21 +527,40 @@ class TranscribeAudioView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        filename = audio_file.name or "audio.wav"
+        
+        # Reject bad uploads before any of the body is read
+        whisper_config = ai_config_module.ai_config.whisper
+        if audio_file.size > whisper_config.max_file_size_mb * 1024 * 1024:
+            return Response(
+                {"error": {
+                    "code": "FILE_TOO_LARGE",
+                    "message": f"File audio vượt quá {whisper_config.max_file_size_mb}MB",
+                }},
+                status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+            )
+        if os.path.splitext(filename)[1][1:].lower() not in whisper_config.supported_formats:
+            return Response(
+                {"error": {
+                    "code": "UNSUPPORTED_FORMAT",
+                    "message": "Định dạng audio không được hỗ trợ. Hỗ trợ: "
+                               + ", ".join(sorted(whisper_config.supported_formats)),
+                }},
+                status=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE
+            )
+        
         language = request.data.get("language", "vi")
         prompt = request.data.get("prompt", "")
         
         try:
-            whisper = get_whisper_service()
+            transcriber = get_cached_transcriber()
             
-            # Read file data
-            audio_data = audio_file.read()
-            filename = audio_file.name or "audio.wav"
             
-            logger.info(f"Transcribing audio: {filename}, size={len(audio_data)}, language={language}")
+            logger.info("Transcribing audio: %s, size=%s, language=%s", filename, audio_file.size, language)
             
-            # Transcribe
-            result = whisper.transcribe(
-                audio_data=audio_data,
+            # Transcribe, handing over the upload's file object (no full copy)
+            result = transcriber.transcribe(
+                audio_data=audio_file.file,
                 filename=filename,
                 language=language,
                 prompt=prompt if prompt else None,
@@ -313,19 +574,19 @@ class TranscribeAudioView(APIView):
             })
             
         except AIServiceConfigError as e:
-            logger.warning(f"Whisper not configured: {e}")
+            logger.warning("Whisper not configured: %s", e)
             return Response(
                 {"error": {"code": "NOT_CONFIGURED", "message": "Whisper API chưa được cấu hình"}},
                 status=status.HTTP_503_SERVICE_UNAVAILABLE
             )
         except AIServiceError as e:
-            logger.error(f"Transcription error: {e.code} - {e.message}")
+            logger.error("Transcription error: %s - %s", e.code, e.message)
             return Response(
                 e.to_dict(),
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
         except Exception as e:
-            logger.exception(f"Unexpected error in transcription: {e}")
+            logger.exception("Unexpected error in transcription: %s", e)
             return Response(
                 {"error": {"code": "INTERNAL_ERROR", "message": "Lỗi chuyển đổi giọng nói. Vui lòng thử lại."}},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -338,6 +599,9 @@ class AIHealthView(APIView):
     """
     permission_classes = []
     
+    def get_permissions(self):
+        return _PERM_NONE
+    
     @swagger_auto_schema(
         operation_description="Kiểm tra trạng thái AI service",
         responses={
@@ -358,25 +622,28 @@ class AIHealthView(APIView):
                 )
             )
         },
-        tags=["AI"]
+        tags=_TAGS
     )
     def get(self, request):
         """Check AI service health."""
-        from .config import ai_config
+        ai_config = ai_config_module.ai_config
+        
+        gemini_ok = ai_config.gemini.validate()
+        whisper_ok = ai_config.whisper.validate()
         
         return Response({
             "status": "ok",
             "services": {
                 "gemini": {
-                    "status": "ok" if ai_config.gemini.validate() else "not_configured",
+                    "status": "ok" if gemini_ok else "not_configured",
                     "model": ai_config.gemini.model,
-                    "configured": ai_config.gemini.validate(),
+                    "configured": gemini_ok,
                 },
                 "whisper": {
-                    "status": "ok" if ai_config.whisper.validate() else "not_configured",
+                    "status": "ok" if whisper_ok else "not_configured",
                     "model": ai_config.whisper.model,
-                    "configured": ai_config.whisper.validate(),
-                    "supported_formats": ai_config.whisper.supported_formats,
+                    "configured": whisper_ok,
+                    "supported_formats": sorted(ai_config.whisper.supported_formats),
                     "max_file_size_mb": ai_config.whisper.max_file_size_mb,
                 },
             },
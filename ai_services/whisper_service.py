@@ -8,22 +8,32 @@ Speech-to-Text service using OpenAI Whisper API with:
 """
 
 import io
+import os
+import asyncio
 import time
+import itertools
+import atexit
+import shutil
 import logging
-from typing import Optional, BinaryIO, Union
+import functools
+import subprocess
+import importlib.util
+from typing import Optional, BinaryIO, NoReturn, Tuple, Union
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 import httpx
 from tenacity import (
     retry,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
     retry_if_exception_type,
     before_sleep_log,
 )
 
-from .config import ai_config, WhisperConfig
+from . import config as ai_config_module
+from .config import WhisperConfig
 from .exceptions import (
     AIServiceError,
     AIServiceConfigError,
@@ -34,10 +44,65 @@ from .exceptions import (
 
 logger = logging.getLogger(__name__)
 
+# Connection pool sizing shared by the sync and async clients
+_POOL_LIMITS = httpx.Limits(
+    max_keepalive_connections=20,
+    max_connections=100,
+    keepalive_expiry=30.0,
+)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+# Upper bound on any single retry wait, including server-requested ones
+_MAX_RETRY_WAIT = 30.0
+
+# Full-jitter backoff so concurrent clients don't retry in lockstep
+_wait_jitter = wait_random_exponential(multiplier=1, max=_MAX_RETRY_WAIT)
+
+
+def _wait_retry_after_or_jitter(retry_state) -> float:
+    """Honor a rate limit's Retry-After when given, else back off with jitter."""
+    error = retry_state.outcome.exception()
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after is not None:
+        return min(retry_after, _MAX_RETRY_WAIT)
+    return _wait_jitter(retry_state)
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+_with_retry = retry(
+    stop=stop_after_attempt(3),
+    wait=_wait_retry_after_or_jitter,
+    retry=retry_if_exception_type((
+        httpx.TimeoutException,
+        httpx.ConnectError,
+        AIServiceRateLimitError,
+    )),
+    before_sleep=before_sleep_log(logger, logging.WARNING),
+)
+
 
 # ===================== AUDIO UTILS =====================
 
-@dataclass
+@dataclass(slots=True)
 class AudioMetadata:
     """Metadata about an audio file."""
     filename: str
@@ -48,6 +113,7 @@ class AudioMetadata:
     channels: Optional[int] = None
 
 
+@functools.lru_cache(maxsize=1024)
 def get_audio_format(filename: str) -> str:
     """Extract audio format from filename."""
     if "." not in filename:
@@ -55,8 +121,23 @@ def get_audio_format(filename: str) -> str:
     return filename.rsplit(".", 1)[-1].lower()
 
 
+def get_audio_size(audio_data: Union[bytes, BinaryIO]) -> int:
+    """
+    Get the size of audio bytes or a seekable file-like without reading it.
+    
+    The file position is restored afterwards.
+    """
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        return len(audio_data)
+    
+    position = audio_data.tell()
+    size = audio_data.seek(0, io.SEEK_END)
+    audio_data.seek(position)
+    return size
+
+
 def validate_audio_file(
-    file_data: bytes,
+    file_data: Union[bytes, BinaryIO],
     filename: str,
     config: WhisperConfig
 ) -> AudioMetadata:
@@ -64,7 +145,7 @@ def validate_audio_file(
     Validate audio file against Whisper requirements.
     
     Args:
-        file_data: Raw audio file bytes
+        file_data: Raw audio file bytes or a seekable file-like object
         filename: Original filename
         config: Whisper configuration
         
@@ -76,14 +157,14 @@ def validate_audio_file(
     """
     # Check format
     audio_format = get_audio_format(filename)
-    if not config.is_supported_format(filename):
+    if audio_format not in config.supported_formats:
         raise AIServiceError(
             f"Unsupported audio format: {audio_format}. "
-            f"Supported formats: {', '.join(config.supported_formats)}"
+            f"Supported formats: {', '.join(sorted(config.supported_formats))}"
         )
     
     # Check file size
-    size_bytes = len(file_data)
+    size_bytes = get_audio_size(file_data)
     max_bytes = config.max_file_size_mb * 1024 * 1024
     if size_bytes > max_bytes:
         raise AIServiceError(
@@ -101,14 +182,76 @@ def validate_audio_file(
     )
 
 
+@functools.lru_cache(maxsize=1)
+def _ffmpeg_path() -> Optional[str]:
+    """Resolve the ffmpeg binary once, or None if it is not installed."""
+    return shutil.which("ffmpeg")
+
+
+def normalize_audio(
+    audio_data: Union[bytes, BinaryIO],
+    filename: str,
+    config: WhisperConfig,
+) -> Tuple[Union[bytes, BinaryIO], str]:
+    """
+    Transcode audio to mono Opus at the Whisper sample rate before upload.
+    
+    Whisper works at 16 kHz mono, so larger inputs (e.g. 48 kHz stereo
+    WAV) only cost upload bandwidth. Returns the input unchanged when
+    normalization is disabled, ffmpeg is missing, transcoding fails, or
+    the result would not be smaller.
+    
+    Returns:
+        (audio_data, filename) to upload
+    """
+    if not config.normalize_audio:
+        return audio_data, filename
+    
+    ffmpeg = _ffmpeg_path()
+    if ffmpeg is None:
+        logger.warning("WHISPER_NORMALIZE_AUDIO is set but ffmpeg was not found; uploading as-is")
+        return audio_data, filename
+    
+    if isinstance(audio_data, (bytes, bytearray, memoryview)):
+        source = bytes(audio_data)
+    else:
+        position = audio_data.tell()
+        source = audio_data.read()
+        audio_data.seek(position)
+    
+    try:
+        completed = subprocess.run(
+            [
+                ffmpeg, "-nostdin", "-loglevel", "error",
+                "-i", "pipe:0",
+                "-ac", "1",
+                "-ar", str(config.target_sample_rate),
+                "-c:a", "libopus", "-b:a", "24k",
+                "-f", "ogg", "pipe:1",
+            ],
+            input=source,
+            capture_output=True,
+            timeout=config.timeout,
+            check=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.warning("Audio normalization failed, uploading original: %s", e)
+        return audio_data, filename
+    
+    normalized = completed.stdout
+    if not normalized or len(normalized) >= len(source):
+        return audio_data, filename
+    
+    logger.info("Normalized audio: %dB -> %dB", len(source), len(normalized))
+    return normalized, os.path.splitext(filename)[0] + ".ogg"
+
+
 # ===================== METRICS =====================
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptionMetrics:
     """Metrics for a transcription request."""
     request_id: str = ""
-    started_at: datetime = field(default_factory=datetime.now)
-    completed_at: Optional[datetime] = None
     duration_ms: float = 0
     audio_size_bytes: int = 0
     audio_duration_seconds: Optional[float] = None
@@ -118,10 +261,27 @@ class TranscriptionMetrics:
     success: bool = False
     error: Optional[str] = None
     
+    # Monotonic clock for durations; wall-clock epoch seconds for timestamps
+    _start_ns: int = field(default_factory=time.perf_counter_ns, repr=False)
+    _started_ts: float = field(default_factory=time.time, repr=False)
+    _completed_ts: Optional[float] = field(default=None, repr=False)
+    
+    @property
+    def started_at(self) -> datetime:
+        """When the transcription started."""
+        return datetime.fromtimestamp(self._started_ts)
+    
+    @property
+    def completed_at(self) -> Optional[datetime]:
+        """When the transcription completed, if it has."""
+        if self._completed_ts is None:
+            return None
+        return datetime.fromtimestamp(self._completed_ts)
+    
     def complete(self, success: bool = True, error: Optional[str] = None):
         """Mark transcription as complete."""
-        self.completed_at = datetime.now()
-        self.duration_ms = (self.completed_at - self.started_at).total_seconds() * 1000
+        self.duration_ms = (time.perf_counter_ns() - self._start_ns) / 1_000_000
+        self._completed_ts = self._started_ts + self.duration_ms / 1000
         self.success = success
         self.error = error
     
@@ -142,7 +302,7 @@ class TranscriptionMetrics:
 
 # ===================== RESPONSE TYPES =====================
 
-@dataclass
+@dataclass(slots=True)
 class TranscriptionResult:
     """Result of a transcription request."""
     text: str
@@ -180,9 +340,23 @@ class WhisperService:
     
     def __init__(self, config: Optional[WhisperConfig] = None):
         """Initialize Whisper service."""
-        self.config = config or ai_config.whisper
+        self.config = config or ai_config_module.ai_config.whisper
         self._client: Optional[httpx.Client] = None
-        self._request_count = 0
+        self._async_client: Optional[httpx.AsyncClient] = None
+        # Atomic under the GIL; pid + start time keep ids unique across processes
+        self._request_counter = itertools.count(1)
+        self._request_id_prefix = f"whisper_{os.getpid()}_{int(time.time())}_"
+        
+        # Stable per-config request parts, built once
+        self._auth_headers = {
+            "Authorization": f"Bearer {self.config.api_key}",
+        }
+        self._base_form = {
+            "model": self.config.model,
+            "response_format": self.config.response_format,
+        }
+        if self.config.default_language:
+            self._base_form["language"] = self.config.default_language
         
         if not self.config.validate():
             logger.warning(
@@ -196,29 +370,60 @@ class WhisperService:
         if self._client is None:
             self._client = httpx.Client(
                 base_url=self.API_BASE_URL,
-                headers={
-                    "Authorization": f"Bearer {self.config.api_key}",
-                },
+                headers=self._auth_headers,
                 timeout=httpx.Timeout(self.config.timeout),
+                # No transport-level retries: tenacity owns retrying
+                transport=httpx.HTTPTransport(
+                    retries=0,
+                    limits=_POOL_LIMITS,
+                    http2=_HTTP2,
+                ),
             )
         return self._client
     
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Get or create the async HTTP client used by transcribe_async."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.API_BASE_URL,
+                headers=self._auth_headers,
+                timeout=httpx.Timeout(self.config.timeout),
+                transport=httpx.AsyncHTTPTransport(
+                    retries=0,
+                    limits=_POOL_LIMITS,
+                    http2=_HTTP2,
+                ),
+            )
+        return self._async_client
+    
     def close(self):
         """Close the HTTP client."""
         if self._client:
             self._client.close()
             self._client = None
     
+    async def aclose(self):
+        """Close the async HTTP client."""
+        if self._async_client:
+            await self._async_client.aclose()
+            self._async_client = None
+    
     def __enter__(self):
         return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
         self.close()
     
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+    
     def _generate_request_id(self) -> str:
         """Generate unique request ID."""
-        self._request_count += 1
-        return f"whisper_{int(time.time())}_{self._request_count}"
+        return f"{self._request_id_prefix}{next(self._request_counter)}"
     
     def _should_retry(self, exception: Exception) -> bool:
         """Determine if request should be retried."""
@@ -229,64 +434,85 @@ class WhisperService:
             return True
         return False
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=2, min=2, max=30),
-        retry=retry_if_exception_type((
-            httpx.TimeoutException,
-            httpx.ConnectError,
-            AIServiceRateLimitError,
-        )),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
-    )
-    def _make_request(
+    def _build_form(
         self,
-        audio_data: bytes,
+        audio_data: Union[bytes, BinaryIO],
         filename: str,
         language: Optional[str] = None,
         prompt: Optional[str] = None,
         response_format: Optional[str] = None,
-    ) -> dict:
-        """
-        Make transcription request to Whisper API.
-        
-        Args:
-            audio_data: Audio file bytes
-            filename: Original filename
-            language: Language code (e.g., 'vi' for Vietnamese)
-            prompt: Optional prompt to guide transcription
-            response_format: Response format (json, text, srt, etc.)
-            
-        Returns:
-            API response dictionary
-        """
+    ) -> Tuple[dict, dict]:
+        """Build the multipart files and form fields for a transcription request."""
         if not self.config.validate():
             raise AIServiceConfigError("OpenAI API key not configured")
         
-        # Prepare form data
+        # Prepare form data; file-likes are streamed by httpx, not buffered
+        if isinstance(audio_data, (bytes, bytearray, memoryview)):
+            audio_data = io.BytesIO(audio_data)
         files = {
-            "file": (filename, io.BytesIO(audio_data)),
+            "file": (filename, audio_data),
         }
         
-        data = {
-            "model": self.config.model,
-        }
+        data = self._base_form.copy()
         
         if language:
             data["language"] = language
-        elif self.config.default_language:
-            data["language"] = self.config.default_language
-            
         if prompt:
             data["prompt"] = prompt
-            
         if response_format:
             data["response_format"] = response_format
-        else:
-            data["response_format"] = self.config.response_format
         
         logger.info(f"Sending transcription request: model={self.config.model}, "
-                   f"language={data.get('language')}, file_size={len(audio_data)}")
+                   f"language={data.get('language')}, file_size={get_audio_size(audio_data)}")
+        
+        return files, data
+    
+    def _raise_for_status_error(self, e: httpx.HTTPStatusError) -> NoReturn:
+        """Translate an HTTP error response into a service exception."""
+        status_code = e.response.status_code
+        
+        if status_code == 429:
+            retry_after = _parse_retry_after(e.response.headers.get("Retry-After"))
+            logger.warning(f"Whisper API rate limit exceeded (retry_after={retry_after})")
+            raise AIServiceRateLimitError("Rate limit exceeded", retry_after=retry_after) from e
+        elif status_code == 401:
+            raise AIServiceConfigError("Invalid OpenAI API key") from e
+        elif status_code >= 500:
+            raise AIServiceError(f"Whisper API server error: {status_code}") from e
+        else:
+            error_body = e.response.text
+            raise AIServiceError(f"Whisper API error ({status_code}): {error_body}") from e
+    
+    def _raise_timeout(self, e: httpx.TimeoutException) -> NoReturn:
+        """Translate an HTTP timeout into a service exception."""
+        logger.warning(f"Whisper API timeout after {self.config.timeout}s")
+        raise AIServiceTimeoutError(
+            f"Request timed out after {self.config.timeout}s"
+        ) from e
+    
+    @_with_retry
+    def _make_request(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        filename: str,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        response_format: Optional[str] = None,
+    ) -> dict:
+        """
+        Make transcription request to Whisper API.
+        
+        Args:
+            audio_data: Audio file bytes or seekable file-like object
+            filename: Original filename
+            language: Language code (e.g., 'vi' for Vietnamese)
+            prompt: Optional prompt to guide transcription
+            response_format: Response format (json, text, srt, etc.)
+            
+        Returns:
+            API response dictionary
+        """
+        files, data = self._build_form(audio_data, filename, language, prompt, response_format)
         
         try:
             response = self.client.post(
@@ -298,24 +524,110 @@ class WhisperService:
             return response.json()
             
         except httpx.HTTPStatusError as e:
-            status_code = e.response.status_code
+            self._raise_for_status_error(e)
+        except httpx.TimeoutException as e:
+            self._raise_timeout(e)
+    
+    @_with_retry
+    async def _make_request_async(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        filename: str,
+        language: Optional[str] = None,
+        prompt: Optional[str] = None,
+        response_format: Optional[str] = None,
+    ) -> dict:
+        """Async version of _make_request using httpx.AsyncClient."""
+        files, data = self._build_form(audio_data, filename, language, prompt, response_format)
+        
+        try:
+            response = await self.async_client.post(
+                "/audio/transcriptions",
+                files=files,
+                data=data,
+            )
+            response.raise_for_status()
+            return response.json()
             
-            if status_code == 429:
-                logger.warning("Whisper API rate limit exceeded")
-                raise AIServiceRateLimitError("Rate limit exceeded") from e
-            elif status_code == 401:
-                raise AIServiceConfigError("Invalid OpenAI API key") from e
-            elif status_code >= 500:
-                raise AIServiceError(f"Whisper API server error: {status_code}") from e
-            else:
-                error_body = e.response.text
-                raise AIServiceError(f"Whisper API error ({status_code}): {error_body}") from e
-                
+        except httpx.HTTPStatusError as e:
+            self._raise_for_status_error(e)
         except httpx.TimeoutException as e:
-            logger.warning(f"Whisper API timeout after {self.config.timeout}s")
-            raise AIServiceTimeoutError(
-                f"Request timed out after {self.config.timeout}s"
-            ) from e
+            self._raise_timeout(e)
+    
+    def _start_transcription(
+        self,
+        audio_data: Union[bytes, BinaryIO],
+        filename: str,
+        language: Optional[str],
+    ) -> Tuple[Union[bytes, BinaryIO], TranscriptionMetrics]:
+        """
+        Validate the audio, returning it with fresh metrics.
+        
+        File-like inputs are passed through unread so the upload can be
+        streamed; only their size is measured. Non-seekable streams have
+        no size until read, so those are buffered.
+        """
+        if not isinstance(audio_data, (bytes, bytearray, memoryview)):
+            seekable = getattr(audio_data, "seekable", None)
+            if seekable is None or not seekable():
+                audio_data = audio_data.read()
+        
+        # Initialize metrics
+        metrics = TranscriptionMetrics(
+            request_id=self._generate_request_id(),
+            audio_size_bytes=get_audio_size(audio_data),
+            language=language or self.config.default_language,
+        )
+        
+        try:
+            # Validate audio file
+            audio_meta = validate_audio_file(audio_data, filename, self.config)
+        except Exception as e:
+            self._fail_transcription(metrics, e)
+            raise
+        
+        logger.info(
+            f"[{metrics.request_id}] Starting transcription: "
+            f"format={audio_meta.format}, size={audio_meta.size_bytes}B"
+        )
+        
+        return audio_data, metrics
+    
+    def _finish_transcription(
+        self,
+        metrics: TranscriptionMetrics,
+        response: dict,
+    ) -> TranscriptionResult:
+        """Parse the API response and record metrics."""
+        # Parse result
+        result = TranscriptionResult.from_api_response(response)
+        
+        # Update metrics
+        metrics.transcript_length = len(result.text)
+        if result.duration:
+            metrics.audio_duration_seconds = result.duration
+        if result.language:
+            metrics.language = result.language
+        metrics.complete(success=True)
+        
+        logger.info(
+            f"[{metrics.request_id}] Transcription complete: "
+            f"duration={metrics.duration_ms:.0f}ms, "
+            f"text_length={metrics.transcript_length}"
+        )
+        
+        if ai_config_module.ai_config.log_responses:
+            logger.debug(f"[{metrics.request_id}] Transcript: {result.text[:200]}...")
+        
+        return result
+    
+    def _fail_transcription(self, metrics: TranscriptionMetrics, error: Exception) -> None:
+        """Record and log a failed transcription."""
+        metrics.complete(success=False, error=str(error))
+        logger.error(
+            f"[{metrics.request_id}] Transcription failed: {error}",
+            extra={"metrics": metrics.to_dict()},
+        )
     
     def transcribe(
         self,
@@ -340,25 +652,10 @@ class WhisperService:
             AIServiceError: On transcription failure
             AIServiceConfigError: If API key not configured
         """
-        # Convert file-like to bytes if needed
-        if hasattr(audio_data, 'read'):
-            audio_data = audio_data.read()
-        
-        # Initialize metrics
-        metrics = TranscriptionMetrics(
-            request_id=self._generate_request_id(),
-            audio_size_bytes=len(audio_data),
-            language=language or self.config.default_language,
-        )
+        audio_data, metrics = self._start_transcription(audio_data, filename, language)
         
         try:
-            # Validate audio file
-            audio_meta = validate_audio_file(audio_data, filename, self.config)
-            
-            logger.info(
-                f"[{metrics.request_id}] Starting transcription: "
-                f"format={audio_meta.format}, size={audio_meta.size_bytes}B"
-            )
+            audio_data, filename = normalize_audio(audio_data, filename, self.config)
             
             # Make API request
             response = self._make_request(
@@ -367,35 +664,10 @@ class WhisperService:
                 language=language,
                 prompt=prompt,
             )
-            
-            # Parse result
-            result = TranscriptionResult.from_api_response(response)
-            
-            # Update metrics
-            metrics.transcript_length = len(result.text)
-            if result.duration:
-                metrics.audio_duration_seconds = result.duration
-            if result.language:
-                metrics.language = result.language
-            metrics.complete(success=True)
-            
-            logger.info(
-                f"[{metrics.request_id}] Transcription complete: "
-                f"duration={metrics.duration_ms:.0f}ms, "
-                f"text_length={metrics.transcript_length}"
-            )
-            
-            if ai_config.log_responses:
-                logger.debug(f"[{metrics.request_id}] Transcript: {result.text[:200]}...")
-            
-            return result
+            return self._finish_transcription(metrics, response)
             
         except Exception as e:
-            metrics.complete(success=False, error=str(e))
-            logger.error(
-                f"[{metrics.request_id}] Transcription failed: {e}",
-                extra={"metrics": metrics.to_dict()},
-            )
+            self._fail_transcription(metrics, e)
             raise
     
     async def transcribe_async(
@@ -408,21 +680,29 @@ class WhisperService:
         """
         Async version of transcribe.
         
-        Note: Uses httpx.AsyncClient internally.
+        Uses httpx.AsyncClient, so the upload and the wait for Whisper
+        don't hold a thread.
         """
-        import asyncio
+        audio_data, metrics = self._start_transcription(audio_data, filename, language)
         
-        # For now, run sync version in thread pool
-        # TODO: Implement true async with httpx.AsyncClient
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            self.transcribe,
-            audio_data,
-            filename,
-            language,
-            prompt,
-        )
+        try:
+            if self.config.normalize_audio:
+                # ffmpeg blocks, so keep it off the event loop
+                audio_data, filename = await asyncio.to_thread(
+                    normalize_audio, audio_data, filename, self.config
+                )
+            
+            response = await self._make_request_async(
+                audio_data=audio_data,
+                filename=filename,
+                language=language,
+                prompt=prompt,
+            )
+            return self._finish_transcription(metrics, response)
+            
+        except Exception as e:
+            self._fail_transcription(metrics, e)
+            raise
 
 
 # ===================== SINGLETON INSTANCE =====================
@@ -435,9 +715,18 @@ def get_whisper_service() -> WhisperService:
     global _whisper_service
     if _whisper_service is None:
         _whisper_service = WhisperService()
+        # Release pooled keep-alive connections on interpreter shutdown
+        atexit.register(_whisper_service.close)
     return _whisper_service
 
 
+@ai_config_module.on_reload
+def _reset_whisper_service(config) -> None:
+    # The next get_whisper_service() builds a client from the new config
+    global _whisper_service
+    _whisper_service = None
+
+
 def transcribe_audio(
     audio_data: Union[bytes, BinaryIO],
     filename: str = "audio.wav",
@@ -476,9 +476,13 @@ const App = {
             document.getElementById('chat-welcome-text').textContent =
                 `Hãy bắt đầu bằng cách gửi lời chào đến ${session.persona?.name || 'phụ huynh'}. Họ sẽ phản hồi theo tính cách đã được thiết lập.`;
 
-            // Load existing messages
-            const messagesData = await API.get(`/sessions/${sessionId}/messages/`);
-            const messages = messagesData.results || messagesData || [];
+            // Load existing messages, following every page
+            const messages = [];
+            for (let page = 1; ; page++) {
+                const messagesData = await API.get(`/sessions/${sessionId}/messages/?page=${page}`);
+                messages.push(...(messagesData.results || []));
+                if (!messagesData.next) break;
+            }
 
             if (messages.length > 0) {
                 document.getElementById('chat-welcome').remove();
@@ -0,0 +1,41 @@
+"""
+Custom DRF renderers.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to DRF's encoder
+    orjson = None
+
+
+# DRF's encoder covers what orjson does not natively (lazy strings,
+# Decimal, querysets, ...) and keeps DRF's datetime formatting
+_drf_default = JSONEncoder().default
+
+_ORJSON_OPTIONS = (orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS) if orjson else 0
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+    
+    Indented output (browsable API, ``Accept: ...; indent=N``) still goes
+    through DRF's renderer, as does everything when orjson is missing.
+    """
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        
+        if orjson is None or self.get_indent(accepted_media_type or "", renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        ret = orjson.dumps(data, default=_drf_default, option=_ORJSON_OPTIONS)
+        
+        # Escape line/paragraph separators like JSONRenderer does
+        if b"\xe2\x80\xa8" in ret or b"\xe2\x80\xa9" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+        return ret
@@ -0,0 +1,31 @@
+"""
+Shared DRF serializer helpers.
+"""
+
+from copy import copy, deepcopy
+
+from rest_framework import serializers
+
+
+class CachedFieldsMixin:
+    """
+    Build a serializer class's fields once and hand out copies.
+    
+    ModelSerializer.get_fields() deep-copies declared fields and re-runs
+    model introspection for every instance. Plain fields are shallow-copied
+    from the per-class cache (bind() then sets parent and source on the
+    copy); nested serializers are deep-copied so their children are never
+    shared between parents.
+    """
+    
+    _fields_cache = {}
+    
+    def get_fields(self):
+        cls = type(self)
+        cached = CachedFieldsMixin._fields_cache.get(cls)
+        if cached is None:
+            cached = CachedFieldsMixin._fields_cache[cls] = super().get_fields()
+        return {
+            name: deepcopy(field) if isinstance(field, serializers.BaseSerializer) else copy(field)
+            for name, field in cached.items()
+        }
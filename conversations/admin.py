@@ -3,6 +3,8 @@ Admin configuration for Conversation models.
 """
 
 from django.contrib import admin
+from django.urls import reverse
+from django.utils.html import format_html
 from .models import Persona, Session, Message
 
 
@@ -40,19 +42,6 @@ class PersonaAdmin(admin.ModelAdmin):
     )
 
 
-class MessageInline(admin.TabularInline):
-    """Inline display for messages in session."""
-    model = Message
-    extra = 0
-    readonly_fields = ["id", "role", "content", "message_type", "created_at"]
-    fields = ["order", "role", "content", "message_type", "created_at"]
-    ordering = ["order"]
-    can_delete = False
-    
-    def has_add_permission(self, request, obj=None):
-        return False
-
-
 @admin.register(Session)
 class SessionAdmin(admin.ModelAdmin):
     """Admin configuration for Session model."""
@@ -61,21 +50,27 @@ class SessionAdmin(admin.ModelAdmin):
         "id", "user", "persona", "status", 
         "total_messages", "rating", "started_at"
     ]
-    list_filter = ["status", "persona", "rating", "started_at"]
+    list_select_related = ("user", "persona")
+    list_filter = [
+        "status",
+        # Only personas that have sessions, not every Persona row
+        ("persona", admin.RelatedOnlyFieldListFilter),
+        "rating",
+        "started_at",
+    ]
     search_fields = ["user__email", "persona__name", "title", "scenario"]
     ordering = ["-started_at"]
     readonly_fields = [
-        "id", "total_messages", "total_duration_seconds", 
+        "id", "total_messages", "messages_link", "total_duration_seconds", 
         "started_at", "ended_at"
     ]
-    inlines = [MessageInline]
     
     fieldsets = (
         ("Thông tin phiên", {
             "fields": ("id", "user", "persona", "title", "scenario")
         }),
         ("Trạng thái", {
-            "fields": ("status", "total_messages", "total_duration_seconds")
+            "fields": ("status", "total_messages", "messages_link", "total_duration_seconds")
         }),
         ("Đánh giá", {
             "fields": ("rating", "feedback", "ai_feedback", "score"),
@@ -86,6 +81,17 @@ class SessionAdmin(admin.ModelAdmin):
             "classes": ("collapse",)
         }),
     )
+    
+    def messages_link(self, obj):
+        """Link to the paginated message list filtered to this session."""
+        if obj.pk is None:
+            return "-"
+        url = reverse("admin:conversations_message_changelist")
+        return format_html(
+            '<a href="{}?session__id__exact={}">Xem {} tin nhắn</a>',
+            url, obj.pk, obj.total_messages
+        )
+    messages_link.short_description = "Tin nhắn"
 
 
 @admin.register(Message)
@@ -96,6 +102,8 @@ class MessageAdmin(admin.ModelAdmin):
         "id", "session", "role", "content_preview", 
         "message_type", "created_at"
     ]
+    # Session.__str__ renders the user's email and the persona's name
+    list_select_related = ("session__user", "session__persona")
     list_filter = ["role", "message_type", "created_at"]
     search_fields = ["content", "session__user__email"]
     ordering = ["-created_at"]
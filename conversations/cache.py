@@ -0,0 +1,42 @@
+"""
+Response cache for the public persona list.
+
+Entries are keyed by a version number plus host and query string; saving or
+deleting any Persona, and creating or deleting a Session (the payload
+carries session counts), bumps the version (see signals.py), which orphans
+every cached page at once without needing pattern deletes. Bulk writes that
+skip signals, like seed_personas, call invalidate_persona_list() directly.
+"""
+
+import os
+
+from django.core.cache import cache
+
+
+PERSONA_LIST_TTL = int(os.environ.get("PERSONA_LIST_CACHE_SECONDS", "300"))
+
+_VERSION_KEY = "persona_list:version"
+
+
+def _version():
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        # Never expires; only ever moves forward
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+def persona_list_key(request):
+    """Cache key for an anonymous persona list request."""
+    # Host is part of the key: avatar URLs in the payload are absolute
+    return f"persona_list:{_version()}:{request.get_host()}:{request.GET.urlencode()}"
+
+
+def invalidate_persona_list():
+    """Drop every cached persona list page."""
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        # Version not set yet: nothing cached under it
+        cache.add(_VERSION_KEY, 1, timeout=None)
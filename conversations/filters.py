@@ -2,10 +2,23 @@
 Filters for Conversations API.
 """
 
+from functools import reduce
+from operator import or_
+
+from django.db.models import Q
 from django_filters import rest_framework as filters
 from .models import Persona, Session, Message
 
 
+# Columns searched by ?search=, each backed by a pg_trgm index
+_PERSONA_SEARCH_LOOKUPS = (
+    "name__icontains",
+    "description__icontains",
+    "background__icontains",
+    "child_name__icontains",
+)
+
+
 class PersonaFilter(filters.FilterSet):
     """
     Filter for Persona model.
@@ -60,18 +73,13 @@ class PersonaFilter(filters.FilterSet):
     
     def search_filter(self, queryset, name, value):
         """
-        Search across name, description, and background fields.
+        Search across name, description, background and child_name fields.
         """
-        from django.db.models import Q
-        
         if not value:
             return queryset
         
         return queryset.filter(
-            Q(name__icontains=value) |
-            Q(description__icontains=value) |
-            Q(background__icontains=value) |
-            Q(child_name__icontains=value)
+            reduce(or_, (Q(**{lookup: value}) for lookup in _PERSONA_SEARCH_LOOKUPS))
         )
 
 
@@ -134,9 +142,15 @@ class SessionFilter(filters.FilterSet):
         ]
     
     def filter_has_feedback(self, queryset, name, value):
-        """Filter sessions that have/don't have feedback."""
+        """
+        Filter sessions that have/don't have feedback.
+        
+        feedback is a non-null TextField, so "" is the only empty value;
+        the has-feedback predicate matches the session_has_feedback_idx
+        partial index condition.
+        """
         if value:
-            return queryset.exclude(feedback="")
+            return queryset.filter(~Q(feedback=""))
         return queryset.filter(feedback="")
 
 
@@ -0,0 +1,36 @@
+# Generated by Django 5.2 on 2026-10-15 09:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0002_trigram_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="persona",
+            index=models.Index(
+                fields=["-created_at"], name="persona_created_desc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["-started_at"], name="session_started_desc_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["status", "-started_at"], name="session_status_started_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["-created_at"], name="message_created_desc_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2 on 2026-10-15 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0003_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                condition=models.Q(("feedback", ""), _negated=True),
+                fields=["-started_at"],
+                name="session_has_feedback_idx",
+            ),
+        ),
+    ]
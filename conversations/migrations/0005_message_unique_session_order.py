@@ -0,0 +1,38 @@
+# Generated by Django 5.2 on 2026-10-15 10:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def renumber_duplicate_orders(apps, schema_editor):
+    """Renumber messages of sessions that have clashing order values."""
+    Message = apps.get_model("conversations", "Message")
+    session_ids = (
+        Message.objects.values("session_id")
+        .annotate(n=Count("id"), distinct_orders=Count("order", distinct=True))
+        .exclude(n=models.F("distinct_orders"))
+        .values_list("session_id", flat=True)
+    )
+    for session_id in session_ids:
+        messages = list(
+            Message.objects.filter(session_id=session_id).order_by("order", "created_at")
+        )
+        for position, message in enumerate(messages, 1):
+            message.order = position
+        Message.objects.bulk_update(messages, ["order"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0004_session_has_feedback_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(renumber_duplicate_orders, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="message",
+            constraint=models.UniqueConstraint(
+                fields=("session", "order"), name="message_unique_session_order"
+            ),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-15 11:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0005_message_unique_session_order"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="message",
+            index=models.Index(
+                fields=["session", "created_at"], name="message_session_created_idx"
+            ),
+        ),
+    ]
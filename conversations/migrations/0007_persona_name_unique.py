@@ -0,0 +1,41 @@
+# Generated by Django 5.2 on 2026-10-15 11:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def rename_duplicate_personas(apps, schema_editor):
+    """Suffix duplicate persona names, keeping the oldest one unchanged."""
+    Persona = apps.get_model("conversations", "Persona")
+    duplicate_names = (
+        Persona.objects.values("name")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("name", flat=True)
+    )
+    for name in duplicate_names:
+        personas = Persona.objects.filter(name=name).order_by("created_at")[1:]
+        for index, persona in enumerate(personas, 2):
+            suffix = f" ({index})"
+            persona.name = name[:100 - len(suffix)] + suffix
+            persona.save(update_fields=["name"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0006_message_session_created_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_duplicate_personas, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="persona",
+            name="name",
+            field=models.CharField(
+                error_messages={"unique": "Persona với tên này đã tồn tại."},
+                max_length=100,
+                unique=True,
+                verbose_name="Tên persona",
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0007_persona_name_unique"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["user", "-started_at"], name="session_user_started_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(
+                fields=["persona", "-started_at"], name="session_persona_started_idx"
+            ),
+        ),
+    ]
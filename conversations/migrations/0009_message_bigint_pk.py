@@ -0,0 +1,56 @@
+# Generated by Django 5.2 on 2026-10-15 12:30
+
+import uuid
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0008_session_owner_started_indexes"),
+    ]
+
+    operations = [
+        # The UUID pk becomes public_id and a bigint identity column takes
+        # over as pk. Nothing references Message by foreign key, so the
+        # swap is done in SQL rather than through AlterField, which cannot
+        # move a primary key between columns.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=[
+                        "ALTER TABLE conversations_message DROP CONSTRAINT conversations_message_pkey",
+                        "ALTER TABLE conversations_message RENAME COLUMN id TO public_id",
+                        "ALTER TABLE conversations_message ADD CONSTRAINT conversations_message_public_id_key UNIQUE (public_id)",
+                        "ALTER TABLE conversations_message ADD COLUMN id bigint GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY",
+                    ],
+                    reverse_sql=[
+                        "ALTER TABLE conversations_message DROP COLUMN id",
+                        "ALTER TABLE conversations_message DROP CONSTRAINT conversations_message_public_id_key",
+                        "ALTER TABLE conversations_message RENAME COLUMN public_id TO id",
+                        "ALTER TABLE conversations_message ADD CONSTRAINT conversations_message_pkey PRIMARY KEY (id)",
+                    ],
+                ),
+            ],
+            state_operations=[
+                migrations.RenameField(
+                    model_name="message",
+                    old_name="id",
+                    new_name="public_id",
+                ),
+                migrations.AlterField(
+                    model_name="message",
+                    name="public_id",
+                    field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                migrations.AddField(
+                    model_name="message",
+                    name="id",
+                    field=models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                    preserve_default=False,
+                ),
+            ],
+        ),
+    ]
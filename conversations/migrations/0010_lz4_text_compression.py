@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-15 13:00
+
+from django.db import migrations
+
+
+# Long free-text columns that are read whole and never compared in SQL
+# beyond icontains; TOAST compression is transparent to both
+COMPRESSED_COLUMNS = (
+    ("conversations_persona", "system_prompt"),
+    ("conversations_message", "content"),
+)
+
+
+def _lz4_available(schema_editor):
+    """PostgreSQL 14+ built with lz4 support."""
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql" or connection.pg_version < 140000:
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_settings "
+            "WHERE name = 'default_toast_compression' AND 'lz4' = ANY(enumvals)"
+        )
+        return cursor.fetchone() is not None
+
+
+def set_compression(method):
+    def apply(apps, schema_editor):
+        if not _lz4_available(schema_editor):
+            return
+        for table, column in COMPRESSED_COLUMNS:
+            schema_editor.execute(
+                f"ALTER TABLE {table} ALTER COLUMN {column} SET COMPRESSION {method}"
+            )
+    return apply
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0009_message_bigint_pk"),
+    ]
+
+    operations = [
+        migrations.RunPython(set_compression("lz4"), set_compression("pglz")),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2 on 2026-10-15 13:30
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def rename_case_duplicate_personas(apps, schema_editor):
+    """Suffix names that differ only by case, keeping the oldest one unchanged."""
+    Persona = apps.get_model("conversations", "Persona")
+    duplicate_keys = (
+        Persona.objects.annotate(key=Lower("name"))
+        .values("key")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("key", flat=True)
+    )
+    for key in duplicate_keys:
+        personas = (
+            Persona.objects.annotate(key=Lower("name"))
+            .filter(key=key)
+            .order_by("created_at")[1:]
+        )
+        for index, persona in enumerate(personas, 2):
+            suffix = f" ({index})"
+            persona.name = persona.name[:100 - len(suffix)] + suffix
+            persona.save(update_fields=["name"])
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("conversations", "0010_lz4_text_compression"),
+    ]
+
+    operations = [
+        migrations.RunPython(rename_case_duplicate_personas, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="persona",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("name"),
+                name="persona_name_ci_unique",
+                violation_error_message="Persona với tên này đã tồn tại.",
+            ),
+        ),
+    ]
@@ -7,9 +7,51 @@ Models:
 - Message: Lịch sử hội thoại (từng tin nhắn trong session)
 """
 
+import os
 import uuid
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Max
+from django.db.models.functions import Cast, Coalesce, Lower, Upper
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex, OpClass
+
+from .services import session_counter
+
+
+def _trigram_index(field_name, name):
+    """
+    GIN trigram index matching Django's icontains SQL on PostgreSQL.
+    
+    icontains compiles to UPPER("col"::text) LIKE UPPER('%q%'), so the
+    index is built over the same expression to be usable by the planner.
+    """
+    return GinIndex(
+        OpClass(Upper(Cast(field_name, models.TextField())), name="gin_trgm_ops"),
+        name=name,
+    )
+
+
+class PersonaQuerySet(models.QuerySet):
+    """QuerySet helpers for Persona."""
+    
+    def for_listing(self):
+        """Skip the long free-text columns that list pages never show."""
+        return self.defer(
+            "background", "communication_style", "common_concerns", "system_prompt"
+        )
+
+
+class SessionQuerySet(models.QuerySet):
+    """QuerySet helpers for Session."""
+    
+    def for_listing(self):
+        """Join user/persona and load only the columns list pages show."""
+        return self.select_related("user", "persona").only(
+            "id", "title", "status", "total_messages", "total_duration_seconds",
+            "rating", "score", "started_at", "ended_at",
+            "user__email",
+            "persona__name", "persona__avatar", "persona__personality_type",
+        )
 
 
 class Persona(models.Model):
@@ -39,7 +81,12 @@ class Persona(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
     # Basic info
-    name = models.CharField(max_length=100, verbose_name="Tên persona")
+    name = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Tên persona",
+        error_messages={"unique": "Persona với tên này đã tồn tại."},
+    )
     avatar = models.ImageField(
         upload_to="personas/avatars/", 
         blank=True, 
@@ -118,13 +165,36 @@ class Persona(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")
     
+    objects = PersonaQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Persona"
         verbose_name_plural = "Personas"
         ordering = ["-created_at"]
+        indexes = [
+            # Default ordering
+            models.Index(fields=["-created_at"], name="persona_created_desc_idx"),
+            # Admin / API search
+            _trigram_index("name", "persona_name_trgm"),
+            _trigram_index("description", "persona_description_trgm"),
+            _trigram_index("background", "persona_background_trgm"),
+            _trigram_index("child_name", "persona_child_name_trgm"),
+        ]
+        constraints = [
+            # Names are unique regardless of case
+            models.UniqueConstraint(
+                Lower("name"),
+                name="persona_name_ci_unique",
+                violation_error_message="Persona với tên này đã tồn tại.",
+            ),
+        ]
     
     def __str__(self):
-        return f"{self.name} ({self.get_personality_type_display()})"
+        return f"{self.name} ({_PERSONALITY_LABELS.get(self.personality_type, self.personality_type)})"
+
+
+# Choice labels resolved once, for the __str__ paths used in logging
+_PERSONALITY_LABELS = dict(Persona.PersonalityType.choices)
 
 
 class Session(models.Model):
@@ -221,10 +291,26 @@ class Session(models.Model):
         verbose_name="Kết thúc lúc"
     )
     
+    objects = SessionQuerySet.as_manager()
+    
     class Meta:
         verbose_name = "Phiên luyện tập"
         verbose_name_plural = "Phiên luyện tập"
         ordering = ["-started_at"]
+        indexes = [
+            # Default ordering, optionally filtered by status
+            models.Index(fields=["-started_at"], name="session_started_desc_idx"),
+            models.Index(fields=["status", "-started_at"], name="session_status_started_idx"),
+            # Per-user ("my sessions") and per-persona listings
+            models.Index(fields=["user", "-started_at"], name="session_user_started_idx"),
+            models.Index(fields=["persona", "-started_at"], name="session_persona_started_idx"),
+            # ?has_feedback=true listings
+            models.Index(
+                fields=["-started_at"],
+                condition=~models.Q(feedback=""),
+                name="session_has_feedback_idx",
+            ),
+        ]
     
     def __str__(self):
         return f"Session {self.id} - {self.user.email} với {self.persona.name}"
@@ -236,10 +322,26 @@ class Session(models.Model):
             return int(delta.total_seconds())
         return 0
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded ended_at so save() can tell if it changed
+        instance._orig_ended_at = instance.__dict__.get("ended_at")
+        return instance
+    
     def save(self, *args, **kwargs):
-        if self.ended_at:
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "ended_at" not in update_fields:
+            # Partial update that can't change the duration
+            return super().save(*args, **kwargs)
+        
+        if self.ended_at and self.ended_at != getattr(self, "_orig_ended_at", None):
             self.total_duration_seconds = self.calculate_duration()
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "total_duration_seconds"}
+        
         super().save(*args, **kwargs)
+        self._orig_ended_at = self.ended_at
 
 
 class Message(models.Model):
@@ -261,7 +363,9 @@ class Message(models.Model):
         VOICE = "voice", "Giọng nói"
         IMAGE = "image", "Hình ảnh"
     
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    # Sequential bigint pk keeps inserts on the rightmost index page;
+    # the UUID stays as the identifier exposed through the API
+    public_id = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     
     # Relationship
     session = models.ForeignKey(
@@ -318,19 +422,94 @@ class Message(models.Model):
         verbose_name = "Tin nhắn"
         verbose_name_plural = "Tin nhắn"
         ordering = ["session", "order", "created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["session", "order"],
+                name="message_unique_session_order",
+            ),
+        ]
+        indexes = [
+            # History by time within a session; (session, order) is already
+            # covered by the message_unique_session_order index
+            models.Index(fields=["session", "created_at"], name="message_session_created_idx"),
+            # Admin ordering
+            models.Index(fields=["-created_at"], name="message_created_desc_idx"),
+            # Admin search
+            _trigram_index("content", "message_content_trgm"),
+        ]
+    
+    @classmethod
+    def next_order_for(cls, session_id):
+        """
+        Get the next free order number in a session.
+        
+        Locks the session row until the surrounding transaction ends, so
+        concurrent appends take turns instead of colliding on
+        message_unique_session_order. Call inside transaction.atomic();
+        bulk callers can take this once and enumerate from it.
+        """
+        list(Session.objects.select_for_update().filter(pk=session_id).values_list("pk"))
+        last_order = cls.objects.filter(session_id=session_id).aggregate(
+            last=Coalesce(Max("order"), 0)
+        )["last"]
+        return last_order + 1
+    
+    @classmethod
+    def bulk_append(cls, session, rows, batch_size=None):
+        """
+        Append many messages to a session in batched INSERTs.
+        
+        Args:
+            session: Session to append to
+            rows: Iterable of Message field dicts (role, content, ...)
+            batch_size: Rows per INSERT (default: MESSAGE_BULK_BATCH_SIZE or 500)
+            
+        Returns:
+            List of created Message instances, in order
+        """
+        batch_size = batch_size or int(os.environ.get("MESSAGE_BULK_BATCH_SIZE", "500"))
+        
+        with transaction.atomic():
+            start = cls.next_order_for(session.pk)
+            messages = [
+                cls(session=session, order=order, **row)
+                for order, row in enumerate(rows, start)
+            ]
+            cls.objects.bulk_create(messages, batch_size=batch_size)
+            
+            # bulk_create skips save(), so bump the counter once for the batch
+            if messages:
+                Session.objects.filter(pk=session.pk).update(
+                    total_messages=models.F("total_messages") + len(messages)
+                )
+                session.total_messages += len(messages)
+        
+        return messages
     
     def __str__(self):
-        content_preview = self.content[:50] + "..." if len(self.content) > 50 else self.content
-        return f"[{self.get_role_display()}] {content_preview}"
+        # Look at 51 chars at most, however long the content is
+        head = self.content[:51]
+        content_preview = head[:50] + "..." if len(head) > 50 else head
+        return f"[{_ROLE_LABELS.get(self.role, self.role)}] {content_preview}"
     
     def save(self, *args, **kwargs):
-        # Auto-increment order if not set
-        if not self.order:
-            last_message = Message.objects.filter(session=self.session).order_by("-order").first()
-            self.order = (last_message.order + 1) if last_message else 1
+        is_new = self._state.adding
         
-        super().save(*args, **kwargs)
+        # Auto-increment order if not set; read and insert under the session lock
+        if not self.order:
+            with transaction.atomic():
+                self.order = Message.next_order_for(self.session_id)
+                super().save(*args, **kwargs)
+        else:
+            super().save(*args, **kwargs)
         
-        # Update session message count
-        self.session.total_messages = Message.objects.filter(session=self.session).count()
-        self.session.save(update_fields=["total_messages"])
+        # Update session message count (coalesced, once the row is committed)
+        if is_new:
+            session_id = self.session_id
+            transaction.on_commit(lambda: session_counter.bump(session_id))
+            # Keep an already-loaded session in step with the row
+            if Message.session.is_cached(self):
+                self.session.total_messages += 1
+
+
+_ROLE_LABELS = dict(Message.MessageRole.choices)
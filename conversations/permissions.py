@@ -5,6 +5,13 @@ Custom permissions for Conversations app.
 from rest_framework import permissions
 
 
+# Marks "attribute not present" (distinct from an attribute set to None)
+_MISSING = object()
+
+# Hash lookup instead of scanning DRF's tuple on every check
+_SAFE_METHODS = frozenset(permissions.SAFE_METHODS)
+
+
 class IsOwnerOrReadOnly(permissions.BasePermission):
     """
     Custom permission:
@@ -14,14 +21,18 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
     
     def has_object_permission(self, request, view, obj):
         # Read permissions are allowed to any request
-        if request.method in permissions.SAFE_METHODS:
+        if request.method in _SAFE_METHODS:
             return True
         
         # Write permissions only for owner or admin
-        if hasattr(obj, "created_by"):
-            return obj.created_by == request.user or request.user.is_staff
+        user = request.user
+        is_staff = user.is_staff
+        created_by_id = getattr(obj, "created_by_id", _MISSING)
+        if created_by_id is not _MISSING:
+            # Compare FK ids so the related user is never loaded
+            return (created_by_id is not None and created_by_id == user.id) or is_staff
         
-        return request.user.is_staff
+        return is_staff
 
 
 class IsOwner(permissions.BasePermission):
@@ -30,10 +41,17 @@ class IsOwner(permissions.BasePermission):
     """
     
     def has_object_permission(self, request, view, obj):
-        if hasattr(obj, "user"):
-            return obj.user == request.user
-        if hasattr(obj, "created_by"):
-            return obj.created_by == request.user
+        # Compare FK ids so the related user is never loaded; anonymous
+        # users have no id and own nothing
+        uid = request.user.id
+        if uid is None:
+            return False
+        owner_id = getattr(obj, "user_id", _MISSING)
+        if owner_id is not _MISSING:
+            return owner_id == uid
+        created_by_id = getattr(obj, "created_by_id", _MISSING)
+        if created_by_id is not _MISSING:
+            return created_by_id == uid
         return False
 
 
@@ -45,6 +63,6 @@ class IsAdminOrReadOnly(permissions.BasePermission):
     """
     
     def has_permission(self, request, view):
-        if request.method in permissions.SAFE_METHODS:
+        if request.method in _SAFE_METHODS:
             return True
         return request.user and request.user.is_staff
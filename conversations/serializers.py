@@ -2,12 +2,64 @@
 Serializers for Conversation models with enhanced validation.
 """
 
-import re
+from functools import cached_property, lru_cache
+from django.db import IntegrityError, transaction
 from rest_framework import serializers
+from config.serializers import CachedFieldsMixin
 from .models import Persona, Session, Message
 
 
-class PersonaListSerializer(serializers.ModelSerializer):
+_PERSONA_NAME_TAKEN = "Đã tồn tại persona với tên này."
+
+
+def _bounded_strip(value, max_len, label, min_len=0, too_short=None):
+    """
+    Strip a text value and check its length bounds in one place.
+    
+    Raises ValidationError with the field's Vietnamese message when the
+    stripped value is shorter than min_len or longer than max_len.
+    """
+    value = value.strip()
+    n = len(value)
+    if n < min_len:
+        raise serializers.ValidationError(
+            too_short or f"{label} phải có ít nhất {min_len} ký tự."
+        )
+    if n > max_len:
+        raise serializers.ValidationError(
+            f"{label} không được quá {max_len} ký tự."
+        )
+    return value
+
+
+# Choice labels for the hand-built MessageSerializer output
+_ROLE_DISPLAY = dict(Message.MessageRole.choices)
+_MESSAGE_TYPE_DISPLAY = dict(Message.MessageType.choices)
+_STATUS_DISPLAY = dict(Session.SessionStatus.choices)
+
+# Columns SessionListRowSerializer reads from Session.objects.values()
+SESSION_LIST_VALUES = (
+    "id", "persona_id", "persona__name", "persona__avatar",
+    "title", "status", "total_messages", "total_duration_seconds",
+    "rating", "score", "started_at", "ended_at",
+)
+_AVATAR_STORAGE = Persona._meta.get_field("avatar").storage
+
+# Stateless; renders datetimes exactly like a ModelSerializer's DateTimeField
+_DATETIME_FIELD = serializers.DateTimeField()
+
+
+@lru_cache(maxsize=4096)
+def _fmt_duration(seconds):
+    """Format a duration in seconds as MM:SS, or HH:MM:SS from one hour up."""
+    minutes, secs = divmod(seconds, 60)
+    if seconds < 3600:
+        return f"{minutes:02d}:{secs:02d}"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+class PersonaListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for listing Personas (minimal info).
     """
@@ -32,10 +84,14 @@ class PersonaListSerializer(serializers.ModelSerializer):
     
     def get_session_count(self, obj):
         """Get total number of sessions using this persona."""
-        return obj.sessions.count()
+        # Prefer the queryset's total_sessions annotation over a COUNT per row
+        total = getattr(obj, "total_sessions", None)
+        if total is None:
+            total = obj.sessions.count()
+        return total
 
 
-class PersonaDetailSerializer(serializers.ModelSerializer):
+class PersonaDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Persona detail view.
     """
@@ -69,17 +125,25 @@ class PersonaDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_by", "created_at", "updated_at"]
     
     def get_session_count(self, obj):
-        return obj.sessions.count()
+        total = getattr(obj, "total_sessions", None)
+        if total is None:
+            total = obj.sessions.count()
+        return total
+    
+    @cached_property
+    def _request_user_id(self):
+        """Id of the requesting user, or None (no request or anonymous)."""
+        request = self.context.get("request")
+        return getattr(getattr(request, "user", None), "id", None)
     
     def get_is_owner(self, obj):
         """Check if current user is the owner."""
-        request = self.context.get("request")
-        if request and hasattr(request, "user"):
-            return obj.created_by == request.user
-        return False
+        # Compare FK ids so the related user is never loaded
+        user_id = self._request_user_id
+        return user_id is not None and obj.created_by_id == user_id
 
 
-class PersonaCreateSerializer(serializers.ModelSerializer):
+class PersonaCreateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for creating/updating Personas with validation.
     """
@@ -93,64 +157,23 @@ class PersonaCreateSerializer(serializers.ModelSerializer):
             "communication_style", "common_concerns", "system_prompt",
             "is_active"
         ]
+        # Drop the UniqueValidator query; the unique constraints decide
+        extra_kwargs = {"name": {"validators": []}}
     
     def validate_name(self, value):
-        """Validate persona name."""
-        value = value.strip()
-        
-        if len(value) < 2:
-            raise serializers.ValidationError(
-                "Tên persona phải có ít nhất 2 ký tự."
-            )
-        
-        if len(value) > 100:
-            raise serializers.ValidationError(
-                "Tên persona không được quá 100 ký tự."
-            )
-        
-        # Check for duplicate name (case-insensitive)
-        existing = Persona.objects.filter(name__iexact=value)
-        if self.instance:
-            existing = existing.exclude(pk=self.instance.pk)
-        
-        if existing.exists():
-            raise serializers.ValidationError(
-                "Đã tồn tại persona với tên này."
-            )
-        
-        return value
+        """Validate persona name (uniqueness is enforced by the database)."""
+        return _bounded_strip(value, 100, "Tên persona", min_len=2)
     
     def validate_description(self, value):
         """Validate description."""
-        value = value.strip()
-        
-        if len(value) < 10:
-            raise serializers.ValidationError(
-                "Mô tả phải có ít nhất 10 ký tự."
-            )
-        
-        if len(value) > 1000:
-            raise serializers.ValidationError(
-                "Mô tả không được quá 1000 ký tự."
-            )
-        
-        return value
+        return _bounded_strip(value, 1000, "Mô tả", min_len=10)
     
     def validate_system_prompt(self, value):
         """Validate system prompt."""
-        value = value.strip()
-        
-        if len(value) < 50:
-            raise serializers.ValidationError(
-                "System prompt phải có ít nhất 50 ký tự để đảm bảo AI có đủ context."
-            )
-        
-        if len(value) > 4000:
-            raise serializers.ValidationError(
-                "System prompt không được quá 4000 ký tự."
-            )
-        
-        return value
+        return _bounded_strip(
+            value, 4000, "System prompt", min_len=50,
+            too_short="System prompt phải có ít nhất 50 ký tự để đảm bảo AI có đủ context.",
+        )
     
     def validate_child_age(self, value):
         """Validate child age."""
@@ -177,13 +200,25 @@ class PersonaCreateSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         # Set created_by to current user
         validated_data["created_by"] = self.context["request"].user
-        return super().create(validated_data)
+        return self._save_unique(super().create, validated_data)
+    
+    def update(self, instance, validated_data):
+        return self._save_unique(super().update, instance, validated_data)
+    
+    def _save_unique(self, save, *args):
+        """Run a save, reporting a duplicate name as a field error."""
+        try:
+            with transaction.atomic():
+                return save(*args)
+        except IntegrityError:
+            raise serializers.ValidationError({"name": [_PERSONA_NAME_TAKEN]})
 
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Message model.
     """
+    id = serializers.UUIDField(source="public_id", read_only=True)
     role_display = serializers.CharField(
         source="get_role_display", 
         read_only=True
@@ -202,9 +237,34 @@ class MessageSerializer(serializers.ModelSerializer):
             "tokens_used", "order", "created_at"
         ]
         read_only_fields = ["id", "order", "tokens_used", "created_at"]
+    
+    def to_representation(self, instance):
+        """
+        Build the dict straight from the model instance.
+        
+        Same output as the declared fields (UUID as string, float duration,
+        created_at in DRF's datetime format and timezone), without per-field
+        dispatch; this serializer renders every message of a transcript.
+        """
+        audio_duration = instance.audio_duration_seconds
+        return {
+            "id": str(instance.public_id),
+            "role": instance.role,
+            "role_display": _ROLE_DISPLAY.get(instance.role, instance.role),
+            "content": instance.content,
+            "message_type": instance.message_type,
+            "message_type_display": _MESSAGE_TYPE_DISPLAY.get(
+                instance.message_type, instance.message_type
+            ),
+            "audio_url": instance.audio_url,
+            "audio_duration_seconds": None if audio_duration is None else float(audio_duration),
+            "tokens_used": instance.tokens_used,
+            "order": instance.order,
+            "created_at": _DATETIME_FIELD.to_representation(instance.created_at),
+        }
 
 
-class MessageCreateSerializer(serializers.ModelSerializer):
+class MessageCreateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for creating messages with validation.
     """
@@ -222,19 +282,10 @@ class MessageCreateSerializer(serializers.ModelSerializer):
     
     def validate_content(self, value):
         """Validate message content."""
-        value = value.strip()
-        
-        if not value:
-            raise serializers.ValidationError(
-                "Nội dung tin nhắn không được để trống."
-            )
-        
-        if len(value) > 10000:
-            raise serializers.ValidationError(
-                "Nội dung tin nhắn không được quá 10000 ký tự."
-            )
-        
-        return value
+        return _bounded_strip(
+            value, 10000, "Nội dung tin nhắn", min_len=1,
+            too_short="Nội dung tin nhắn không được để trống.",
+        )
     
     def validate(self, attrs):
         """Cross-field validation."""
@@ -250,7 +301,7 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         return attrs
 
 
-class SessionListSerializer(serializers.ModelSerializer):
+class SessionListSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for listing Sessions.
     """
@@ -273,19 +324,47 @@ class SessionListSerializer(serializers.ModelSerializer):
     
     def get_duration_formatted(self, obj):
         """Format duration as HH:MM:SS or MM:SS."""
-        seconds = obj.total_duration_seconds
-        if seconds < 3600:
-            minutes = seconds // 60
-            secs = seconds % 60
-            return f"{minutes:02d}:{secs:02d}"
+        return _fmt_duration(obj.total_duration_seconds)
+
+
+class SessionListRowSerializer(serializers.Serializer):
+    """
+    Render SessionListSerializer's output from values() rows.
+    
+    The list action fetches plain dicts (see SESSION_LIST_VALUES) instead of
+    model instances; the output keys and formats match SessionListSerializer.
+    """
+    
+    def to_representation(self, row):
+        avatar = row["persona__avatar"]
+        if avatar:
+            # Same URL an ImageField would render
+            avatar = _AVATAR_STORAGE.url(avatar)
+            request = self.context.get("request")
+            if request is not None:
+                avatar = request.build_absolute_uri(avatar)
         else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            secs = seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+            avatar = None
+        
+        return {
+            "id": str(row["id"]),
+            "persona": row["persona_id"],
+            "persona_name": row["persona__name"],
+            "persona_avatar": avatar,
+            "title": row["title"],
+            "status": row["status"],
+            "status_display": _STATUS_DISPLAY.get(row["status"], row["status"]),
+            "total_messages": row["total_messages"],
+            "total_duration_seconds": row["total_duration_seconds"],
+            "duration_formatted": _fmt_duration(row["total_duration_seconds"]),
+            "rating": row["rating"],
+            "score": row["score"],
+            "started_at": _DATETIME_FIELD.to_representation(row["started_at"]),
+            "ended_at": _DATETIME_FIELD.to_representation(row["ended_at"]),
+        }
 
 
-class SessionDetailSerializer(serializers.ModelSerializer):
+class SessionDetailSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for Session detail with messages.
     """
@@ -312,40 +391,36 @@ class SessionDetailSerializer(serializers.ModelSerializer):
             "started_at", "ended_at"
         ]
     
+    def to_representation(self, instance):
+        # Hand the view's persona_session_count annotation to the nested
+        # PersonaListSerializer, which reads total_sessions
+        count = getattr(instance, "persona_session_count", None)
+        if count is not None:
+            instance.persona.total_sessions = count
+        return super().to_representation(instance)
+    
     def get_duration_formatted(self, obj):
-        seconds = obj.total_duration_seconds
-        if seconds < 3600:
-            minutes = seconds // 60
-            secs = seconds % 60
-            return f"{minutes:02d}:{secs:02d}"
-        else:
-            hours = seconds // 3600
-            minutes = (seconds % 3600) // 60
-            secs = seconds % 60
-            return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+        return _fmt_duration(obj.total_duration_seconds)
 
 
-class SessionCreateSerializer(serializers.ModelSerializer):
+class SessionCreateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for creating a new Session.
     """
+    # Inactive personas fail the pk lookup itself, no second check needed
+    persona = serializers.PrimaryKeyRelatedField(
+        queryset=Persona.objects.filter(is_active=True),
+        error_messages={"does_not_exist": "Persona này không khả dụng."},
+    )
+    
     class Meta:
         model = Session
         fields = ["persona", "title", "scenario"]
     
-    def validate_persona(self, value):
-        if not value.is_active:
-            raise serializers.ValidationError("Persona này không khả dụng.")
-        return value
-    
     def validate_title(self, value):
         """Validate title if provided."""
         if value:
-            value = value.strip()
-            if len(value) > 255:
-                raise serializers.ValidationError(
-                    "Tiêu đề không được quá 255 ký tự."
-                )
+            value = _bounded_strip(value, 255, "Tiêu đề")
         return value
     
     def create(self, validated_data):
@@ -353,28 +428,37 @@ class SessionCreateSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
-class SessionUpdateSerializer(serializers.ModelSerializer):
+class SessionUpdateSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for updating Session (status, feedback).
     """
+    rating = serializers.IntegerField(
+        min_value=1,
+        max_value=5,
+        required=False,
+        allow_null=True,
+        error_messages={
+            "min_value": "Đánh giá phải từ 1 đến 5 sao.",
+            "max_value": "Đánh giá phải từ 1 đến 5 sao.",
+        },
+    )
+    feedback = serializers.CharField(
+        max_length=2000,
+        required=False,
+        allow_blank=True,
+        error_messages={"max_length": "Phản hồi không được quá 2000 ký tự."},
+    )
+    
     class Meta:
         model = Session
         fields = ["status", "rating", "feedback"]
     
-    def validate_rating(self, value):
-        if value and (value < 1 or value > 5):
-            raise serializers.ValidationError("Đánh giá phải từ 1 đến 5 sao.")
-        return value
-    
-    def validate_feedback(self, value):
-        """Validate feedback."""
-        if value:
-            value = value.strip()
-            if len(value) > 2000:
-                raise serializers.ValidationError(
-                    "Phản hồi không được quá 2000 ký tự."
-                )
-        return value
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # total_messages is bumped concurrently with F(); never write it back
+        instance.save(update_fields=list(validated_data))
+        return instance
 
 
 class SessionEndSerializer(serializers.Serializer):
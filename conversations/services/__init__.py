@@ -0,0 +1,3 @@
+"""
+Service helpers for the conversations app.
+"""
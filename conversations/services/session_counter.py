@@ -0,0 +1,108 @@
+"""
+Coalesced Session.total_messages increments.
+
+Message.save() bumps a per-session counter in memory instead of issuing one
+UPDATE per message. A background timer flushes the pending counts every
+SESSION_COUNTER_FLUSH_MS milliseconds (default 100) with one
+F()-increment per session, so a burst of messages costs one write per window.
+
+Set SESSION_COUNTER_FLUSH_MS=0 to flush synchronously on every bump
+(management commands; the test runner does this automatically). Pending counts are flushed at interpreter
+exit; a hard crash can lose at most one window of increments. Failed
+UPDATEs are re-queued and retried on their own timer, backing off up to
+_MAX_RETRY_DELAY seconds.
+"""
+
+import atexit
+import logging
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import models
+
+
+logger = logging.getLogger(__name__)
+
+_FLUSH_INTERVAL = getattr(settings, "SESSION_COUNTER_FLUSH_MS", 100) / 1000
+_MAX_RETRY_DELAY = 30.0
+
+_pending: Counter = Counter()
+_lock = threading.Lock()
+_timer = None
+_retry_delay = 0.0
+
+
+def bump(session_id, n: int = 1) -> None:
+    """Queue an increment of a session's total_messages."""
+    global _timer
+    
+    with _lock:
+        _pending[session_id] += n
+        if _FLUSH_INTERVAL <= 0:
+            schedule = False
+        else:
+            schedule = _timer is None
+            if schedule:
+                _timer = threading.Timer(_FLUSH_INTERVAL, _flush_from_timer)
+                _timer.daemon = True
+    
+    if _FLUSH_INTERVAL <= 0:
+        flush_pending()
+    elif schedule:
+        _timer.start()
+
+
+def flush_pending() -> None:
+    """Write all pending increments, one UPDATE per session."""
+    # Imported here: models imports this module
+    from conversations.models import Session
+    
+    global _timer, _retry_delay
+    
+    with _lock:
+        batch = dict(_pending)
+        _pending.clear()
+    
+    failed = False
+    for session_id, n in batch.items():
+        try:
+            Session.objects.filter(pk=session_id).update(
+                total_messages=models.F("total_messages") + n
+            )
+        except Exception as e:
+            # Put the count back for the retry timer below
+            logger.error("Session counter flush failed for %s: %s", session_id, e)
+            failed = True
+            with _lock:
+                _pending[session_id] += n
+    
+    retry = None
+    with _lock:
+        if not failed:
+            _retry_delay = 0.0
+        elif _timer is None:
+            # Don't wait for another bump(): a quiet session would never retry
+            _retry_delay = min(max(_retry_delay * 2, _FLUSH_INTERVAL, 0.1), _MAX_RETRY_DELAY)
+            retry = _timer = threading.Timer(_retry_delay, _flush_from_timer)
+            _timer.daemon = True
+    
+    if retry is not None:
+        retry.start()
+
+
+def _flush_from_timer() -> None:
+    global _timer
+    
+    with _lock:
+        _timer = None
+    
+    try:
+        flush_pending()
+    finally:
+        # Timer threads get their own connection; don't leak it
+        from django.db import connection
+        connection.close()
+
+
+atexit.register(flush_pending)
@@ -0,0 +1,29 @@
+"""
+Signal handlers for Conversations app.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_persona_list
+from .models import Persona, Session
+
+
+@receiver(post_save, sender=Persona)
+@receiver(post_delete, sender=Persona)
+def persona_changed(sender, **kwargs):
+    """Invalidate the cached public persona list."""
+    invalidate_persona_list()
+
+
+@receiver(post_save, sender=Session)
+def session_created(sender, created, **kwargs):
+    """Invalidate the cached persona list, whose session counts just changed."""
+    if created:
+        invalidate_persona_list()
+
+
+@receiver(post_delete, sender=Session)
+def session_deleted(sender, **kwargs):
+    """Invalidate the cached persona list, whose session counts just changed."""
+    invalidate_persona_list()
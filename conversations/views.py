@@ -2,8 +2,11 @@
 Views for Conversation API endpoints with enhanced permissions and filtering.
 """
 
+from functools import lru_cache
+
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Count, Avg
+from django.db.models import Count, Avg, OuterRef, Prefetch, Q, Subquery
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -19,6 +22,8 @@ from .serializers import (
     PersonaDetailSerializer,
     PersonaCreateSerializer,
     SessionListSerializer,
+    SessionListRowSerializer,
+    SESSION_LIST_VALUES,
     SessionDetailSerializer,
     SessionCreateSerializer,
     SessionUpdateSerializer,
@@ -28,6 +33,31 @@ from .serializers import (
 )
 from .permissions import IsOwnerOrReadOnly, IsOwner
 from .filters import PersonaFilter, SessionFilter, MessageFilter
+from .cache import PERSONA_LIST_TTL, persona_list_key
+
+
+@lru_cache(maxsize=None)
+def _auto_related(serializer_cls):
+    """
+    Derive select_related/prefetch_related lookups from a serializer.
+    
+    Dotted sources (e.g. "persona.name") select the relation they walk
+    through; many=True fields prefetch their source. Computed once per class.
+    """
+    select, prefetch = set(), set()
+    for name, field in serializer_cls().get_fields().items():
+        source = field.source or name
+        if "." in source:
+            select.add(source.rsplit(".", 1)[0].replace(".", "__"))
+        if getattr(field, "many", False):
+            prefetch.add(source.replace(".", "__"))
+    return tuple(sorted(select)), tuple(sorted(prefetch))
+
+
+def _with_auto_related(queryset, serializer_cls):
+    """Apply the relations serializer_cls reads to queryset."""
+    select, prefetch = _auto_related(serializer_cls)
+    return queryset.select_related(*select).prefetch_related(*prefetch)
 
 
 class PersonaViewSet(viewsets.ModelViewSet):
@@ -67,9 +97,12 @@ class PersonaViewSet(viewsets.ModelViewSet):
         return [permission() for permission in permission_classes]
     
     def get_queryset(self):
-        queryset = Persona.objects.select_related("created_by").annotate(
-            total_sessions=Count("sessions")
-        )
+        queryset = Persona.objects.annotate(total_sessions=Count("sessions"))
+        if self.action in ("list", "my_personas"):
+            queryset = _with_auto_related(queryset.for_listing(), PersonaListSerializer)
+        else:
+            # Every other action responds with the detail serializer
+            queryset = _with_auto_related(queryset, PersonaDetailSerializer)
         
         # For non-authenticated users, only show active personas
         if not self.request.user.is_authenticated:
@@ -77,7 +110,6 @@ class PersonaViewSet(viewsets.ModelViewSet):
         
         # For regular users, show active personas + their own
         elif not self.request.user.is_staff:
-            from django.db.models import Q
             queryset = queryset.filter(
                 Q(is_active=True) | Q(created_by=self.request.user)
             )
@@ -97,7 +129,17 @@ class PersonaViewSet(viewsets.ModelViewSet):
         tags=["Personas"]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        # Logged-in users may also see their own inactive personas, so only
+        # the anonymous (active personas only) view is shared and cached
+        if request.user.is_authenticated:
+            return super().list(request, *args, **kwargs)
+        
+        key = persona_list_key(request)
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, PERSONA_LIST_TTL)
+        return Response(data)
     
     @swagger_auto_schema(
         operation_description="Xem chi tiết persona",
@@ -149,9 +191,10 @@ class PersonaViewSet(viewsets.ModelViewSet):
     def destroy(self, request, *args, **kwargs):
         instance = self.get_object()
         
-        # Check if persona has active sessions
-        active_sessions = instance.sessions.filter(status=Session.SessionStatus.ACTIVE).count()
-        if active_sessions > 0:
+        # Check if persona has active sessions (EXISTS; count only to report)
+        active = instance.sessions.filter(status=Session.SessionStatus.ACTIVE)
+        if active.exists():
+            active_sessions = active.count()
             return Response(
                 {"error": f"Không thể xóa persona đang có {active_sessions} session đang hoạt động."},
                 status=status.HTTP_400_BAD_REQUEST
@@ -201,7 +244,7 @@ class PersonaViewSet(viewsets.ModelViewSet):
         
         stats = sessions.aggregate(
             total=Count("id"),
-            completed=Count("id", filter={"status": Session.SessionStatus.COMPLETED}),
+            completed=Count("id", filter=Q(status=Session.SessionStatus.COMPLETED)),
             avg_rating=Avg("rating"),
             avg_duration=Avg("total_duration_seconds")
         )
@@ -214,6 +257,20 @@ class PersonaViewSet(viewsets.ModelViewSet):
         })
 
 
+# Columns MessageSerializer renders (plus the keys Django needs)
+_MESSAGE_LIST_FIELDS = (
+    "id", "public_id", "session_id", "role", "content",
+    "message_type", "audio_url", "audio_duration_seconds",
+    "tokens_used", "order", "created_at",
+)
+
+# Largest message list add_message accepts in one request
+_MAX_MESSAGE_BATCH = 100
+
+# SessionViewSet actions whose response includes persona and messages
+_SESSION_DETAIL_ACTIONS = frozenset({"retrieve", "end", "abandon"})
+
+
 class SessionViewSet(viewsets.ModelViewSet):
     """
     API endpoints for Session management.
@@ -232,10 +289,40 @@ class SessionViewSet(viewsets.ModelViewSet):
         if not self.request.user.is_authenticated:
             return Session.objects.none()
         
+        # List pages need no messages and only the listed columns
+        if self.action == "list":
+            return _with_auto_related(
+                Session.objects.for_listing().filter(user=self.request.user),
+                SessionListSerializer,
+            )
+        
         # Only return sessions belonging to current user
-        return Session.objects.filter(
-            user=self.request.user
-        ).select_related("persona").prefetch_related("messages")
+        queryset = Session.objects.filter(user=self.request.user)
+        
+        # Actions that render SessionDetailSerializer or the message history
+        if self.action in _SESSION_DETAIL_ACTIONS:
+            # The nested persona is joined and its session count computed in
+            # the same SELECT; messages come back already in conversation order
+            queryset = queryset.select_related("persona").annotate(
+                persona_session_count=Subquery(
+                    Session.objects.filter(persona_id=OuterRef("persona_id"))
+                    .order_by()
+                    .values("persona_id")
+                    .annotate(n=Count("id"))
+                    .values("n")[:1]
+                )
+            ).prefetch_related(
+                Prefetch(
+                    "messages",
+                    queryset=Message.objects.order_by("order", "created_at").only(
+                        *_MESSAGE_LIST_FIELDS
+                    ),
+                ),
+            )
+            # Added after the explicit Prefetch, which takes precedence
+            queryset = _with_auto_related(queryset, SessionDetailSerializer)
+        
+        return queryset
     
     def get_serializer_class(self):
         if self.action == "list":
@@ -256,7 +343,16 @@ class SessionViewSet(viewsets.ModelViewSet):
         tags=["Sessions"]
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        # Filter/order as usual, then fetch plain rows instead of model instances
+        queryset = self.filter_queryset(self.get_queryset()).values(*SESSION_LIST_VALUES)
+        
+        page = self.paginate_queryset(queryset)
+        rows = queryset if page is None else page
+        data = SessionListRowSerializer(rows, many=True, context=self.get_serializer_context()).data
+        
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
     
     @swagger_auto_schema(
         operation_description="Xem chi tiết session với lịch sử tin nhắn",
@@ -311,7 +407,8 @@ class SessionViewSet(viewsets.ModelViewSet):
         if "feedback" in serializer.validated_data:
             session.feedback = serializer.validated_data["feedback"]
         
-        session.save()
+        # total_messages is bumped concurrently with F(); never write it back
+        session.save(update_fields=["status", "ended_at", "rating", "feedback"])
         
         return Response(
             SessionDetailSerializer(session, context={"request": request}).data,
@@ -326,7 +423,11 @@ class SessionViewSet(viewsets.ModelViewSet):
     )
     @action(detail=True, methods=["post"])
     def add_message(self, request, pk=None):
-        """Add a message to the session."""
+        """
+        Add a message to the session.
+        
+        A JSON list of messages is appended in one batch and returned as a list.
+        """
         session = self.get_object()
         
         if session.status != Session.SessionStatus.ACTIVE:
@@ -335,6 +436,21 @@ class SessionViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        # Batch: one INSERT per MESSAGE_BULK_BATCH_SIZE rows, one counter UPDATE
+        if isinstance(request.data, list):
+            if len(request.data) > _MAX_MESSAGE_BATCH:
+                return Response(
+                    {"error": f"Chỉ có thể thêm tối đa {_MAX_MESSAGE_BATCH} tin nhắn mỗi lần."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            serializer = MessageCreateSerializer(data=request.data, many=True)
+            serializer.is_valid(raise_exception=True)
+            messages = Message.bulk_append(session, serializer.validated_data)
+            return Response(
+                MessageSerializer(messages, many=True).data,
+                status=status.HTTP_201_CREATED
+            )
+        
         serializer = MessageCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         
@@ -349,15 +465,19 @@ class SessionViewSet(viewsets.ModelViewSet):
         )
     
     @swagger_auto_schema(
-        operation_description="Lấy lịch sử tin nhắn của session",
+        operation_description="Lấy lịch sử tin nhắn của session (phân trang)",
         responses={200: MessageSerializer(many=True)},
         tags=["Sessions"]
     )
     @action(detail=True, methods=["get"])
     def messages(self, request, pk=None):
-        """Get all messages in a session."""
+        """Get the messages of a session, one page at a time."""
         session = self.get_object()
-        messages = session.messages.all()
+        messages = session.messages.order_by("order", "created_at").only(*_MESSAGE_LIST_FIELDS)
+        
+        page = self.paginate_queryset(messages)
+        if page is not None:
+            return self.get_paginated_response(MessageSerializer(page, many=True).data)
         return Response(MessageSerializer(messages, many=True).data)
     
     @swagger_auto_schema(
@@ -378,7 +498,7 @@ class SessionViewSet(viewsets.ModelViewSet):
         
         session.status = Session.SessionStatus.ABANDONED
         session.ended_at = timezone.now()
-        session.save()
+        session.save(update_fields=["status", "ended_at"])
         
         return Response(
             SessionDetailSerializer(session, context={"request": request}).data,
@@ -407,11 +527,12 @@ class MessageListView(generics.ListAPIView):
         if not session_id:
             return Message.objects.none()
         
-        # Only return messages from user's own sessions
+        # Only return messages from user's own sessions; the ownership check
+        # is a filter, the serializer needs no session columns
         return Message.objects.filter(
             session_id=session_id,
             session__user=self.request.user
-        ).select_related("session")
+        ).only(*_MESSAGE_LIST_FIELDS)
     
     @swagger_auto_schema(
         operation_description="Lấy danh sách tin nhắn theo session",
@@ -0,0 +1,50 @@
+"""
+JWT authentication with a per-process cache of validated access tokens.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+# Most recently used tokens kept per process
+_CACHE_SIZE = 4096
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that verifies each access token only once.
+    
+    A token's signature and claims never change, so a successfully
+    validated token is kept (keyed by its raw bytes) until its "exp"
+    claim passes; after that it is evicted and validated again, which
+    fails with the usual expired-token error.
+    """
+
+    _tokens = OrderedDict()
+    _lock = threading.Lock()
+
+    def get_validated_token(self, raw_token):
+        now = time.time()
+
+        with self._lock:
+            entry = self._tokens.get(raw_token)
+            if entry is not None:
+                token, exp = entry
+                if exp > now:
+                    self._tokens.move_to_end(raw_token)
+                    return token
+                del self._tokens[raw_token]
+
+        token = super().get_validated_token(raw_token)
+
+        exp = token.payload.get("exp")
+        if exp is not None:
+            with self._lock:
+                self._tokens[raw_token] = (token, exp)
+                if len(self._tokens) > _CACHE_SIZE:
+                    self._tokens.popitem(last=False)
+
+        return token
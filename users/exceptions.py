@@ -5,6 +5,13 @@ Custom exception handler for consistent error responses.
 from rest_framework.views import exception_handler
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.utils.serializer_helpers import ReturnDict, ReturnList
+
+# Exact types DRF puts in response.data / exc.detail; checked with
+# "type(x) in ..." instead of isinstance on every error response
+_DICT_TYPES = frozenset({dict, ReturnDict})
+_LIST_TYPES = frozenset({list, ReturnList})
 
 
 def custom_exception_handler(exc, context):
@@ -24,6 +31,11 @@ def custom_exception_handler(exc, context):
     # Call REST framework's default exception handler first
     response = exception_handler(exc, context)
 
+    # Serializer errors: response.data is exc.detail, shape already known
+    if response is not None and isinstance(exc, ValidationError):
+        response.data = _validation_error_body(exc.detail, response.status_code)
+        return response
+
     if response is not None:
         custom_response = {
             "success": False,
@@ -34,12 +46,13 @@ def custom_exception_handler(exc, context):
         }
         
         # Add field-specific errors if available
-        if isinstance(response.data, dict):
+        data_type = type(response.data)
+        if data_type in _DICT_TYPES:
             # Check if it's a field validation error
             field_errors = {}
             for key, value in response.data.items():
-                if key not in ["detail", "non_field_errors"]:
-                    if isinstance(value, list):
+                if key not in ("detail", "non_field_errors"):
+                    if type(value) in _LIST_TYPES:
                         field_errors[key] = value[0] if len(value) == 1 else value
                     else:
                         field_errors[key] = value
@@ -50,13 +63,13 @@ def custom_exception_handler(exc, context):
             # Handle non_field_errors
             if "non_field_errors" in response.data:
                 errors = response.data["non_field_errors"]
-                custom_response["error"]["message"] = errors[0] if isinstance(errors, list) else errors
+                custom_response["error"]["message"] = errors[0] if type(errors) in _LIST_TYPES else errors
             
             # Handle detail message
             if "detail" in response.data:
                 custom_response["error"]["message"] = str(response.data["detail"])
         
-        elif isinstance(response.data, list):
+        elif data_type in _LIST_TYPES:
             custom_response["error"]["message"] = response.data[0] if response.data else "Đã xảy ra lỗi."
         
         response.data = custom_response
@@ -64,34 +77,72 @@ def custom_exception_handler(exc, context):
     return response
 
 
+def _validation_error_body(detail, status_code):
+    """
+    Build the error body for a ValidationError in a single pass.
+    
+    Same output as the generic path: field errors unwrapped when they hold
+    one message, non_field_errors (then detail) as the message.
+    """
+    error = {
+        "code": get_error_code(status_code),
+        "message": str(detail),
+    }
+    
+    detail_type = type(detail)
+    if detail_type in _DICT_TYPES:
+        field_errors = {}
+        for key, value in detail.items():
+            if key == "non_field_errors":
+                error["message"] = value[0] if type(value) in _LIST_TYPES else value
+            elif key != "detail":
+                field_errors[key] = value[0] if type(value) in _LIST_TYPES and len(value) == 1 else value
+        
+        if "detail" in detail:
+            error["message"] = str(detail["detail"])
+        if field_errors:
+            error["details"] = field_errors
+    
+    elif detail_type in _LIST_TYPES:
+        error["message"] = detail[0] if detail else "Đã xảy ra lỗi."
+    
+    return {"success": False, "error": error}
+
+
+# Status code -> error code / default message, built once at import
+_ERROR_CODES = {
+    400: "BAD_REQUEST",
+    401: "UNAUTHORIZED",
+    403: "FORBIDDEN",
+    404: "NOT_FOUND",
+    405: "METHOD_NOT_ALLOWED",
+    429: "TOO_MANY_REQUESTS",
+    500: "INTERNAL_SERVER_ERROR",
+}
+
+_ERROR_MESSAGES = {
+    400: "Dữ liệu không hợp lệ.",
+    401: "Vui lòng đăng nhập để tiếp tục.",
+    403: "Bạn không có quyền thực hiện thao tác này.",
+    404: "Không tìm thấy tài nguyên yêu cầu.",
+    405: "Phương thức không được hỗ trợ.",
+    429: "Quá nhiều yêu cầu. Vui lòng thử lại sau.",
+    500: "Đã xảy ra lỗi máy chủ. Vui lòng thử lại sau.",
+}
+
+
 def get_error_code(status_code):
     """Map HTTP status code to error code."""
-    error_codes = {
-        400: "BAD_REQUEST",
-        401: "UNAUTHORIZED",
-        403: "FORBIDDEN",
-        404: "NOT_FOUND",
-        405: "METHOD_NOT_ALLOWED",
-        429: "TOO_MANY_REQUESTS",
-        500: "INTERNAL_SERVER_ERROR",
-    }
-    return error_codes.get(status_code, f"ERROR_{status_code}")
+    code = _ERROR_CODES.get(status_code)
+    if code is None:
+        code = f"ERROR_{status_code}"
+    return code
 
 
 def get_error_message(status_code, exc):
     """Get default error message for status code."""
-    error_messages = {
-        400: "Dữ liệu không hợp lệ.",
-        401: "Vui lòng đăng nhập để tiếp tục.",
-        403: "Bạn không có quyền thực hiện thao tác này.",
-        404: "Không tìm thấy tài nguyên yêu cầu.",
-        405: "Phương thức không được hỗ trợ.",
-        429: "Quá nhiều yêu cầu. Vui lòng thử lại sau.",
-        500: "Đã xảy ra lỗi máy chủ. Vui lòng thử lại sau.",
-    }
-    
     # Try to get message from exception first
     if hasattr(exc, "detail"):
         return str(exc.detail)
     
-    return error_messages.get(status_code, "Đã xảy ra lỗi.")
+    return _ERROR_MESSAGES.get(status_code, "Đã xảy ra lỗi.")
@@ -0,0 +1,42 @@
+# Generated by Django 5.2 on 2026-10-15 14:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Refuse to migrate while emails collide case-insensitively."""
+    User = apps.get_model("users", "User")
+    duplicates = list(
+        User.objects.annotate(email_ci=Lower("email"))
+        .values("email_ci")
+        .annotate(n=Count("id"))
+        .filter(n__gt=1)
+        .values_list("email_ci", flat=True)
+    )
+    if duplicates:
+        # Accounts can't be merged or renamed safely here; an operator must decide
+        raise RuntimeError(
+            "Cannot add user_email_ci_uniq: these emails belong to more than one "
+            "user when compared case-insensitively: " + ", ".join(sorted(duplicates))
+        )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="user",
+            constraint=models.UniqueConstraint(
+                django.db.models.functions.text.Lower("email"),
+                name="user_email_ci_uniq",
+                violation_error_message="Email này đã được sử dụng.",
+            ),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2 on 2026-10-15 14:30
+
+import users.models
+from django.db import migrations
+
+
+def fill_avatar_urls(apps, schema_editor):
+    """Store the storage URL of every existing avatar."""
+    User = apps.get_model("users", "User")
+    users = list(User.objects.exclude(avatar="").exclude(avatar__isnull=True).only("id", "avatar"))
+    for user in users:
+        user.avatar_url = user.avatar.url
+    User.objects.bulk_update(users, ["avatar_url"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0002_user_email_ci_uniq"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_url",
+            field=users.models.AvatarURLField(
+                blank=True, default="", editable=False, max_length=500, verbose_name="URL ảnh đại diện"
+            ),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_avatar_urls, migrations.RunPython.noop),
+    ]
@@ -4,6 +4,22 @@ Custom User Model for Voice Chat application.
 
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models.functions import Lower
+
+
+class AvatarURLField(models.CharField):
+    """
+    Stores the avatar's storage URL, refreshed on every save.
+    
+    Declared after the avatar field, so pre_save runs once the uploaded file
+    has been committed to storage under its final name.
+    """
+
+    def pre_save(self, model_instance, add):
+        avatar = model_instance.avatar
+        value = avatar.url if avatar else ""
+        setattr(model_instance, self.attname, value)
+        return value
 
 
 class User(AbstractUser):
@@ -13,6 +29,7 @@ class User(AbstractUser):
     email = models.EmailField(unique=True, verbose_name="Email")
     phone = models.CharField(max_length=15, blank=True, null=True, verbose_name="Số điện thoại")
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True, verbose_name="Ảnh đại diện")
+    avatar_url = AvatarURLField(max_length=500, blank=True, editable=False, verbose_name="URL ảnh đại diện")
     is_verified = models.BooleanField(default=False, verbose_name="Đã xác minh")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Ngày tạo")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Ngày cập nhật")
@@ -25,6 +42,21 @@ class User(AbstractUser):
         verbose_name = "Người dùng"
         verbose_name_plural = "Người dùng"
         ordering = ["-created_at"]
+        constraints = [
+            # Emails are unique regardless of case
+            models.UniqueConstraint(
+                Lower("email"),
+                name="user_email_ci_uniq",
+                violation_error_message="Email này đã được sử dụng.",
+            ),
+        ]
 
     def __str__(self):
         return self.email
+
+    def save(self, *args, **kwargs):
+        # avatar_url follows avatar, also on partial saves
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "avatar" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "avatar_url"}
+        super().save(*args, **kwargs)
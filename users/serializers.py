@@ -6,15 +6,34 @@ from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from config.serializers import CachedFieldsMixin
 
 User = get_user_model()
 
 
-class UserSerializer(serializers.ModelSerializer):
+class AvatarField(serializers.ImageField):
+    """
+    ImageField that accepts uploads as usual but renders the stored
+    avatar_url, skipping storage URL building and build_absolute_uri.
+    """
+
+    def get_attribute(self, instance):
+        return instance.avatar_url
+
+    def to_representation(self, value):
+        return value or None
+
+
+class UserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """
     Serializer for User model - used for responses.
     """
+    avatar = AvatarField(required=False, allow_null=True)
+
     class Meta:
         model = User
         fields = [
@@ -24,6 +43,13 @@ class UserSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "is_verified", "is_active", "created_at", "updated_at"]
 
+    def update(self, instance, validated_data):
+        """Update the profile, writing only the submitted columns."""
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     """
@@ -48,46 +74,57 @@ class RegisterSerializer(serializers.ModelSerializer):
             "email", "username", "password", "password_confirm",
             "first_name", "last_name", "phone"
         ]
+        # Keep the character check, drop the UniqueValidator query;
+        # duplicates are caught as IntegrityError in create()
+        extra_kwargs = {"username": {"validators": [UnicodeUsernameValidator()]}}
 
     def validate_email(self, value):
-        """Validate email is unique."""
-        if User.objects.filter(email=value.lower()).exists():
-            raise serializers.ValidationError("Email này đã được sử dụng.")
+        """Normalize email (uniqueness is enforced by the database)."""
         return value.lower()
 
-    def validate_username(self, value):
-        """Validate username is unique."""
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError("Username này đã được sử dụng.")
-        return value
-
-    def validate_password(self, value):
-        """Validate password strength."""
-        try:
-            validate_password(value)
-        except ValidationError as e:
-            raise serializers.ValidationError(list(e.messages))
-        return value
-
     def validate(self, attrs):
-        """Validate password confirmation matches."""
+        """Validate password confirmation matches, then password strength."""
         if attrs["password"] != attrs["password_confirm"]:
             raise serializers.ValidationError({
                 "password_confirm": "Mật khẩu xác nhận không khớp."
             })
+        
+        # Validated here rather than in validate_password so the similarity
+        # validator can compare against the submitted email/username/names
+        user = User(
+            email=attrs["email"],
+            username=attrs["username"],
+            first_name=attrs.get("first_name", ""),
+            last_name=attrs.get("last_name", ""),
+        )
+        try:
+            validate_password(attrs["password"], user=user)
+        except ValidationError as e:
+            raise serializers.ValidationError({"password": list(e.messages)})
         return attrs
 
     def create(self, validated_data):
         """Create new user with hashed password."""
         validated_data.pop("password_confirm")
-        user = User.objects.create_user(
-            email=validated_data["email"],
-            username=validated_data["username"],
-            password=validated_data["password"],
+        # What create_user() does, but saved as a plain INSERT
+        user = User(
+            email=User.objects.normalize_email(validated_data["email"]),
+            username=User.normalize_username(validated_data["username"]),
             first_name=validated_data.get("first_name", ""),
             last_name=validated_data.get("last_name", ""),
             phone=validated_data.get("phone", ""),
         )
+        user.set_password(validated_data["password"])
+        try:
+            with transaction.atomic():
+                user.save(force_insert=True)
+        except IntegrityError as e:
+            # Both email constraints have "email" in their name; the only
+            # other unique constraint is username's
+            constraint = getattr(getattr(e.__cause__, "diag", None), "constraint_name", None) or ""
+            if "email" in constraint:
+                raise serializers.ValidationError({"email": ["Email này đã được sử dụng."]})
+            raise serializers.ValidationError({"username": ["Username này đã được sử dụng."]})
         return user
 
 
@@ -104,7 +141,7 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         return data
 
 
-class ChangePasswordSerializer(serializers.Serializer):
+class ChangePasswordSerializer(CachedFieldsMixin, serializers.Serializer):
     """
     Serializer for password change.
     """
@@ -8,7 +8,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 
@@ -22,6 +25,36 @@ from .serializers import (
 User = get_user_model()
 
 
+# ===================== SWAGGER SCHEMAS =====================
+_STRING = openapi.Schema(type=openapi.TYPE_STRING)
+_OBJECT = openapi.Schema(type=openapi.TYPE_OBJECT)
+
+_REGISTER_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={"message": _STRING, "user": _OBJECT, "tokens": _OBJECT},
+)
+
+_LOGIN_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={"access": _STRING, "refresh": _STRING, "user": _OBJECT},
+)
+
+_REFRESH_SCHEMA = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={"access": _STRING},
+)
+
+_LOGOUT_BODY = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    required=["refresh"],
+    properties={
+        "refresh": openapi.Schema(type=openapi.TYPE_STRING, description="Refresh token")
+    },
+)
+
+_USER_RESPONSE = UserSerializer()
+
+
 class RegisterView(generics.CreateAPIView):
     """
     API endpoint for user registration.
@@ -32,19 +65,15 @@ class RegisterView(generics.CreateAPIView):
     permission_classes = [AllowAny]
     serializer_class = RegisterSerializer
 
+    # Output-only and stateless: one instance renders every response
+    _user_out = UserSerializer()
+
     @swagger_auto_schema(
         operation_description="Đăng ký tài khoản mới",
         responses={
             201: openapi.Response(
                 description="Đăng ký thành công",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "message": openapi.Schema(type=openapi.TYPE_STRING),
-                        "user": openapi.Schema(type=openapi.TYPE_OBJECT),
-                        "tokens": openapi.Schema(type=openapi.TYPE_OBJECT),
-                    }
-                )
+                schema=_REGISTER_SCHEMA
             ),
             400: "Dữ liệu không hợp lệ"
         },
@@ -53,14 +82,17 @@ class RegisterView(generics.CreateAPIView):
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
         
-        # Generate tokens for the new user
+        # Commit the user first; signing happens after the transaction ends
+        with transaction.atomic():
+            user = serializer.save()
+        
+        # Generate tokens for the new user (records its OutstandingToken)
         refresh = RefreshToken.for_user(user)
         
         return Response({
             "message": "Đăng ký thành công!",
-            "user": UserSerializer(user).data,
+            "user": self._user_out.to_representation(user),
             "tokens": {
                 "refresh": str(refresh),
                 "access": str(refresh.access_token),
@@ -83,14 +115,7 @@ class LoginView(TokenObtainPairView):
         responses={
             200: openapi.Response(
                 description="Đăng nhập thành công",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "access": openapi.Schema(type=openapi.TYPE_STRING),
-                        "refresh": openapi.Schema(type=openapi.TYPE_STRING),
-                        "user": openapi.Schema(type=openapi.TYPE_OBJECT),
-                    }
-                )
+                schema=_LOGIN_SCHEMA
             ),
             401: "Thông tin đăng nhập không chính xác"
         },
@@ -113,12 +138,7 @@ class RefreshTokenView(TokenRefreshView):
         responses={
             200: openapi.Response(
                 description="Token mới",
-                schema=openapi.Schema(
-                    type=openapi.TYPE_OBJECT,
-                    properties={
-                        "access": openapi.Schema(type=openapi.TYPE_STRING),
-                    }
-                )
+                schema=_REFRESH_SCHEMA
             ),
             401: "Refresh token không hợp lệ hoặc đã hết hạn"
         },
@@ -139,13 +159,7 @@ class LogoutView(APIView):
 
     @swagger_auto_schema(
         operation_description="Đăng xuất và vô hiệu hóa refresh token",
-        request_body=openapi.Schema(
-            type=openapi.TYPE_OBJECT,
-            required=["refresh"],
-            properties={
-                "refresh": openapi.Schema(type=openapi.TYPE_STRING, description="Refresh token")
-            }
-        ),
+        request_body=_LOGOUT_BODY,
         responses={
             200: "Đăng xuất thành công",
             400: "Token không hợp lệ"
@@ -161,8 +175,24 @@ class LogoutView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
+            # Signature, expiry and type are still verified here
             token = RefreshToken(refresh_token)
-            token.blacklist()
+            
+            # Tokens issued by login/refresh are already outstanding: skip
+            # blacklist()'s user and get_or_create lookups and insert the
+            # blacklist row directly (a repeated logout is a no-op)
+            outstanding_id = (
+                OutstandingToken.objects.filter(jti=token[jwt_settings.JTI_CLAIM])
+                .values_list("id", flat=True)
+                .first()
+            )
+            if outstanding_id is None:
+                token.blacklist()
+            else:
+                BlacklistedToken.objects.bulk_create(
+                    [BlacklistedToken(token_id=outstanding_id)],
+                    ignore_conflicts=True,
+                )
             
             return Response(
                 {"message": "Đăng xuất thành công!"},
@@ -190,7 +220,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
     @swagger_auto_schema(
         operation_description="Lấy thông tin profile của user hiện tại",
-        responses={200: UserSerializer()},
+        responses={200: _USER_RESPONSE},
         tags=["Profile"]
     )
     def get(self, request, *args, **kwargs):
@@ -198,7 +228,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
     @swagger_auto_schema(
         operation_description="Cập nhật thông tin profile",
-        responses={200: UserSerializer()},
+        responses={200: _USER_RESPONSE},
         tags=["Profile"]
     )
     def put(self, request, *args, **kwargs):
@@ -206,7 +236,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 
     @swagger_auto_schema(
         operation_description="Cập nhật một phần thông tin profile",
-        responses={200: UserSerializer()},
+        responses={200: _USER_RESPONSE},
         tags=["Profile"]
     )
     def patch(self, request, *args, **kwargs):
@@ -243,9 +273,9 @@ class ChangePasswordView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Set new password
+        # Set new password (only the hash and timestamp are written)
         user.set_password(serializer.validated_data["new_password"])
-        user.save()
+        user.save(update_fields=["password", "updated_at"])
         
         return Response(
             {"message": "Đổi mật khẩu thành công!"},